@@ -8,8 +8,7 @@ import os
 sys.path.append(os.path.dirname(__file__))
 
 from PIL import Image, ImageDraw
-from generator import LVGLIconGenerator
-import tkinter as tk
+from generator import IconCodegen
 
 def create_microphone_icon():
     """Create a simple microphone icon for demo"""
@@ -59,17 +58,8 @@ def demo_programmatic_usage():
     mic_img.save("demo_microphone.png")
     print("Saved demo_microphone.png")
     
-    # Create generator instance (hidden window)
-    root = tk.Tk()
-    root.withdraw()  # Hide the window
-    
-    generator = LVGLIconGenerator(root)
-    
-    # Set up the generator with our data
-    generator.input_data = list(mic_img.getdata())
-    generator.icon_name.set("icon_microphone")
-    generator.image_width.set(76)
-    generator.image_height.set(76)
+    # Set up the code generator with our data (no GUI needed)
+    generator = IconCodegen("icon_microphone", 76, 76, mic_img.tobytes())
     
     # Generate C content
     print("Generating C file content...")
@@ -110,7 +100,6 @@ def demo_programmatic_usage():
     print("4. Use in your UI:")
     print("   lv_img_set_src(your_img_obj, &icon_microphone);")
     
-    root.destroy()
     print("\nDemo completed!")
 
 if __name__ == "__main__":
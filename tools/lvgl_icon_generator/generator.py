@@ -19,11 +19,252 @@ Usage:
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-import struct
 import os
 import sys
 from PIL import Image, ImageTk
 import io
+import itertools
+
+# Lookup tables mapping an 8-bit channel straight to its bit field in the packed pixel.
+# A8R3G3B2 colour byte: RRRGGGBB
+_A8R3G3B2_R = bytes(v & 0xE0 for v in range(256))
+_A8R3G3B2_G = bytes((v >> 5) << 2 for v in range(256))
+_A8R3G3B2_B = bytes(v >> 6 for v in range(256))
+# RGB565 low byte: GGGBBBBB, high byte: RRRRRGGG
+_RGB565_LO_G = bytes(((v >> 2) << 5) & 0xFF for v in range(256))
+_RGB565_LO_B = bytes(v >> 3 for v in range(256))
+_RGB565_HI_R = bytes(v & 0xF8 for v in range(256))
+_RGB565_HI_G = bytes(v >> 5 for v in range(256))
+_INVERT = bytes(0xFF - v for v in range(256))
+
+# C source wrapped around the pixel data, filled in with str.format
+_C_HEADER = '''#ifdef LV_LVGL_H_INCLUDE_SIMPLE
+#include "lvgl.h"
+#else
+#include "lvgl/lvgl.h"
+#endif
+
+#ifndef LV_ATTRIBUTE_MEM_ALIGN
+#define LV_ATTRIBUTE_MEM_ALIGN
+#endif
+#ifndef LV_ATTRIBUTE_IMG_{NAME}
+#define LV_ATTRIBUTE_IMG_{NAME}
+#endif
+const LV_ATTRIBUTE_MEM_ALIGN LV_ATTRIBUTE_IMG_{NAME} uint8_t {name}_map[] = {{
+'''
+
+_C_FOOTER = '''}};
+
+const lv_img_dsc_t {name} = {{
+  .header.cf = {cf},
+  .header.always_zero = 0,
+  .header.reserved = 0,
+  .header.w = {width},
+  .header.h = {height},
+  .data_size = {width} * {height} * LV_IMG_PX_SIZE_ALPHA_BYTE,
+  .data = {name}_map,
+}};
+'''
+
+
+def _rgba_bytes(pixels):
+    """Return pixel data as flat RGBA bytes (accepts bytes or a sequence of RGBA tuples)"""
+    if isinstance(pixels, (bytes, bytearray, memoryview)):
+        return bytes(pixels)
+    return bytes(itertools.chain.from_iterable(pixels))
+
+
+def _interleave(*planes):
+    """Interleave equally sized byte planes into a single buffer, one byte per plane per pixel"""
+    step = len(planes)
+    out = bytearray(len(planes[0]) * step)
+    for i, plane in enumerate(planes):
+        out[i::step] = plane
+    return out
+
+
+def _or_planes(*planes):
+    """Bitwise OR byte planes together (done on big ints, so it runs in C rather than per byte)"""
+    acc = 0
+    for plane in planes:
+        acc |= int.from_bytes(plane, 'little')
+    return acc.to_bytes(len(planes[0]), 'little')
+
+
+def _and_planes(*planes):
+    """Bitwise AND byte planes together"""
+    acc = int.from_bytes(planes[0], 'little')
+    for plane in planes[1:]:
+        acc &= int.from_bytes(plane, 'little')
+    return acc.to_bytes(len(planes[0]), 'little')
+
+
+def _keep_mask(planes, key):
+    """Return a plane that is 0x00 where every plane matches its key byte and 0xFF elsewhere"""
+    hits = []
+    for plane, k in zip(planes, key):
+        table = bytearray(256)
+        table[k] = 0xFF
+        hits.append(plane.translate(table))
+    return _and_planes(*hits).translate(_INVERT)
+
+
+def _pack_a8r3g3b2(r, g, b, a, key=None):
+    """Pack RGBA planes as A8R3G3B2 (colour byte, alpha byte); pixels whose colour equals key are cleared"""
+    color = _or_planes(
+        r.translate(_A8R3G3B2_R),
+        g.translate(_A8R3G3B2_G),
+        b.translate(_A8R3G3B2_B),
+    )
+    # A C-level byte scan decides up front whether the masking pass is needed at all
+    if key is not None and key in color:
+        keep = _keep_mask([color], [key])
+        color, a = _and_planes(color, keep), _and_planes(a, keep)
+    return _interleave(color, a)
+
+
+def _rgb565_planes(r, g, b, a, key=None):
+    """Return the RGB565 low byte, high byte and alpha planes; pixels whose colour equals key are cleared"""
+    lo = _or_planes(
+        g.translate(_RGB565_LO_G),
+        b.translate(_RGB565_LO_B),
+    )
+    hi = _or_planes(
+        r.translate(_RGB565_HI_R),
+        g.translate(_RGB565_HI_G),
+    )
+    # No pixel can match unless both key bytes occur in their planes
+    if key is not None and key & 0xFF in lo and key >> 8 in hi:
+        keep = _keep_mask([lo, hi], [key & 0xFF, key >> 8])
+        lo, hi, a = (_and_planes(plane, keep) for plane in (lo, hi, a))
+    return lo, hi, a
+
+
+def _pack_r8g8b8a8(pixels, key=None):
+    """Return packed RGBA pixels, clearing those equal to the 0xRRGGBBAA key"""
+    # The input is already RGBA, so it can be searched for the key word directly:
+    # a single C-level substring scan skips the plane work when no pixel can match
+    if key is None or key.to_bytes(4, 'big') not in pixels:
+        return pixels
+    planes = [pixels[0::4], pixels[1::4], pixels[2::4], pixels[3::4]]
+    keep = _keep_mask(planes, key.to_bytes(4, 'big'))
+    return _interleave(*(_and_planes(plane, keep) for plane in planes))
+
+
+class IconCodegen:
+    """Builds the LVGL C source for one icon from plain values (no Tk needed)"""
+    def __init__(self, icon_name, width, height, pixels, a8r3g3b2=True, a8r5g6b5=True,
+                 a8r5g6b5_swap=True, r8g8b8a8=True, chroma_key=None):
+        self.icon_name = icon_name
+        self.width = width
+        self.height = height
+        # Packed RGBA bytes or a sequence of RGBA tuples
+        self.pixels = pixels
+        # Pixel formats to emit
+        self.a8r3g3b2 = a8r3g3b2
+        self.a8r5g6b5 = a8r5g6b5
+        self.a8r5g6b5_swap = a8r5g6b5_swap
+        self.r8g8b8a8 = r8g8b8a8
+        # Colour value whose pixels are made fully transparent, or None
+        self.chroma_key = chroma_key
+        
+    def generate_c_content(self):
+        """Generate the complete C file content"""
+        out = io.StringIO()
+        self.generate_c_stream(out)
+        return out.getvalue()
+        
+    def generate_c_stream(self, fp):
+        """Write the complete C file content to the text stream fp, section by section"""
+        self._write_header(fp)
+        
+        # Generate data for different color depths
+        self.generate_color_depth_data(fp)
+        
+        self._write_footer(fp)
+        
+    def _write_header(self, fp):
+        """Write the includes and the opening of the pixel map array"""
+        fp.write(_C_HEADER.format(name=self.icon_name, NAME=self.icon_name.upper()))
+        
+    def _write_footer(self, fp):
+        """Close the pixel map array and write the image descriptor"""
+        # Always use LV_IMG_CF_TRUE_COLOR_ALPHA for consistency with manufacturer files
+        # The actual transparency/chroma key is handled by the pixel data and render settings
+        cf = "LV_IMG_CF_TRUE_COLOR_ALPHA"
+
+        fp.write(_C_FOOTER.format(name=self.icon_name, cf=cf, width=self.width, height=self.height))
+        
+    def generate_color_depth_data(self, fp):
+        """Write pixel data for different color depths to the text stream fp"""
+        width = self.width
+        height = self.height
+        chroma_key = self.chroma_key
+        
+        # Local copy of exactly width * height RGBA pixels, padded with transparent ones;
+        # self.pixels is left untouched so regenerating gives the same output
+        size = width * height * 4
+        pixels = _rgba_bytes(self.pixels)[:size]
+        pixels += bytes(size - len(pixels))
+            
+        # Work on whole colour planes instead of per-pixel tuples; the 32-bit section
+        # uses the packed pixels as they are, so the planes are only split when needed
+        if self.a8r3g3b2 or self.a8r5g6b5 or self.a8r5g6b5_swap:
+            r, g, b, a = pixels[0::4], pixels[1::4], pixels[2::4], pixels[3::4]
+
+        if self.a8r3g3b2:
+            fp.write("#if LV_COLOR_DEPTH == 1 || LV_COLOR_DEPTH == 8\n")
+            fp.write("  /*Pixel format: Alpha 8 bit, Red: 3 bit, Green: 3 bit, Blue: 2 bit*/\n")
+            key = chroma_key if chroma_key is not None and 0 <= chroma_key <= 0xFF else None
+            data = _pack_a8r3g3b2(r, g, b, a, key)
+            self.write_byte_array(fp, data, width * 2)
+            fp.write("\n#endif\n\n")
+
+        if self.a8r5g6b5 or self.a8r5g6b5_swap:
+            # Both 16-bit layouts hold the same bytes, so pack once and only reorder
+            key = chroma_key if chroma_key is not None and 0 <= chroma_key <= 0xFFFF else None
+            lo, hi, a565 = _rgb565_planes(r, g, b, a, key)
+
+        if self.a8r5g6b5:
+            fp.write("#if LV_COLOR_DEPTH == 16 && LV_COLOR_16_SWAP == 0\n")
+            fp.write("  /*Pixel format: Alpha 8 bit, Red: 5 bit, Green: 6 bit, Blue: 5 bit*/\n")
+            data = _interleave(lo, hi, a565)
+            self.write_byte_array(fp, data, width * 3)
+            fp.write("\n#endif\n\n")
+
+        if self.a8r5g6b5_swap:
+            fp.write("#if LV_COLOR_DEPTH == 16 && LV_COLOR_16_SWAP != 0\n")
+            fp.write("  /*Pixel format: Alpha 8 bit, Red: 5 bit, Green: 6 bit, Blue: 5 bit, SWAPPED*/\n")
+            data = _interleave(hi, lo, a565)
+            self.write_byte_array(fp, data, width * 3)
+            fp.write("\n#endif\n\n")
+
+        if self.r8g8b8a8:
+            fp.write("#if LV_COLOR_DEPTH == 32\n")
+            fp.write("  /*Pixel format: Red: 8 bit, Green: 8 bit, Blue: 8 bit, Alpha: 8 bit*/\n")
+            key = chroma_key if chroma_key is not None and 0 <= chroma_key <= 0xFFFFFFFF else None
+            data = _pack_r8g8b8a8(pixels, key)
+            self.write_byte_array(fp, data, width * 4)
+            fp.write("\n#endif\n\n")
+        
+    def write_byte_array(self, fp, data, width):
+        """Write byte array as C code to the text stream fp, one block of rows at a time"""
+        # Only about 64 KiB of text exists at a time instead of the whole array's
+        data = memoryview(data if isinstance(data, (bytes, bytearray)) else bytes(data))
+        block = width * max(1, 65536 // (6 * width)) if width else len(data)
+        for start in range(0, len(data), block):
+            if start:
+                fp.write(",\n")
+            fp.write(self.format_byte_array(data[start:start + block], width))
+        
+    def format_byte_array(self, data, width):
+        """Format byte array as C code"""
+        # memoryview.hex() formats a whole row in C, on a zero-copy window of the buffer;
+        # the separators are spliced in afterwards
+        data = memoryview(data if isinstance(data, (bytes, bytearray, memoryview)) else bytes(data))
+        lines = ["  0x" + data[i:i + width].hex(" ").replace(" ", ", 0x") for i in range(0, len(data), width)]
+        return ",\n".join(lines)
+
 
 class LVGLIconGenerator:
     def __init__(self, root):
@@ -37,6 +278,7 @@ class LVGLIconGenerator:
         self.image_width = tk.IntVar(value=76)
         self.image_height = tk.IntVar(value=76)
         self.preview_image = None
+        self.preview_source = None
         self.last_path = os.getcwd()
         self.f_a8r3g3b2 = tk.BooleanVar(value=True)
         self.f_a8r5g6b5 = tk.BooleanVar(value=True)
@@ -44,6 +286,7 @@ class LVGLIconGenerator:
         self.f_r8g8b8a8 = tk.BooleanVar(value=True)
         self.use_chroma_key = tk.BooleanVar(value=False)
         self.chroma_key_value = tk.StringVar(value="0x00")
+        self.fast_resize = tk.BooleanVar(value=False)
         
         self.setup_ui()
         
@@ -97,6 +340,7 @@ class LVGLIconGenerator:
         # File input
         ttk.Button(input_frame, text="Load Image File", command=self.load_image_file).grid(row=0, column=0, pady=5)
         ttk.Button(input_frame, text="Load Raw Pixel Data", command=self.load_raw_data).grid(row=0, column=1, pady=5)
+        ttk.Checkbutton(input_frame, text="Fast resize (bilinear)", variable=self.fast_resize).grid(row=0, column=2, sticky=tk.W, pady=5)
         
         # Raw data input
         ttk.Label(input_frame, text="Or paste raw pixel data (hex format):").grid(row=1, column=0, columnspan=2, sticky=tk.W, pady=5)
@@ -132,12 +376,14 @@ class LVGLIconGenerator:
                 # Load and convert image
                 img = Image.open(file_path).convert('RGBA')
                 
-                # Resize if needed
-                if img.size != (self.image_width.get(), self.image_height.get()):
-                    img = img.resize((self.image_width.get(), self.image_height.get()), Image.LANCZOS)
+                # Resize if needed (LANCZOS for best quality unless fast resize is ticked)
+                size = (self.image_width.get(), self.image_height.get())
+                if img.size != size:
+                    resample = Image.BILINEAR if self.fast_resize.get() else Image.LANCZOS
+                    img = img.resize(size, resample)
                 
-                # Convert to pixel data
-                self.input_data = list(img.getdata())
+                # Keep PIL's packed RGBA buffer rather than a list of pixel tuples
+                self.input_data = img.tobytes()
                 self.update_preview(img)
                 self.status_label.config(text=f"Loaded image: {os.path.basename(file_path)}")
                 
@@ -153,18 +399,22 @@ class LVGLIconGenerator:
                 return
                 
             # Parse hex data
-            hex_data = text.replace(',', ' ').replace('0x', '').split()
-            pixel_data = [int(h, 16) for h in hex_data if h]
+            cleaned = text.replace(',', ' ').replace('0x', '').replace('0X', '')
+            try:
+                # bytes.fromhex skips the whitespace between two-digit tokens, so the
+                # usual input is decoded in one C pass without splitting it into strings
+                pixel_data = bytes.fromhex(cleaned)
+            except ValueError:
+                # Single-digit (or malformed) tokens: convert them one by one
+                pixel_data = bytes(int(h, 16) for h in cleaned.split())
             
             if len(pixel_data) % 4 != 0:
                 messagebox.showerror("Error", "Pixel data must be in RGBA format (4 bytes per pixel)")
                 return
                 
-            # Convert to RGBA tuples
-            self.input_data = []
-            for i in range(0, len(pixel_data), 4):
-                if i + 3 < len(pixel_data):
-                    self.input_data.append((pixel_data[i], pixel_data[i+1], pixel_data[i+2], pixel_data[i+3]))
+            # Keep the packed RGBA bytes as they are
+            self.input_data = pixel_data
+            pixel_count = len(pixel_data) // 4
             
             # Create preview image
             if self.input_data:
@@ -172,14 +422,15 @@ class LVGLIconGenerator:
                 height = self.image_height.get()
                 expected_size = width * height
                 
-                if len(self.input_data) != expected_size:
-                    messagebox.showwarning("Warning", f"Expected {expected_size} pixels, got {len(self.input_data)}")
+                if pixel_count != expected_size:
+                    messagebox.showwarning("Warning", f"Expected {expected_size} pixels, got {pixel_count}")
                     
-                # Create PIL image for preview
-                img = Image.new('RGBA', (width, height))
-                img.putdata(self.input_data[:expected_size])
+                # Create PIL image for preview straight from the buffer (short data stays transparent)
+                raw = pixel_data[:expected_size * 4]
+                raw += bytes(expected_size * 4 - len(raw))
+                img = Image.frombytes('RGBA', (width, height), raw)
                 self.update_preview(img)
-                self.status_label.config(text=f"Loaded {len(self.input_data)} pixels")
+                self.status_label.config(text=f"Loaded {pixel_count} pixels")
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to parse raw data: {str(e)}")
@@ -187,10 +438,20 @@ class LVGLIconGenerator:
     def update_preview(self, img):
         """Update preview image"""
         try:
-            # Resize for preview
-            preview_img = img.resize((100, 100), Image.LANCZOS)
-            self.preview_image = ImageTk.PhotoImage(preview_img)
+            # Nothing to do if the same pixels are already shown
+            source = (img.size, img.tobytes())
+            if source == self.preview_source:
+                return
+            
+            # Resize for preview (bilinear is plenty at 100x100)
+            preview_img = img.resize((100, 100), Image.BILINEAR)
+            if self.preview_image is None:
+                self.preview_image = ImageTk.PhotoImage(preview_img)
+            else:
+                # Same size every time, so repaint the existing photo image
+                self.preview_image.paste(preview_img)
             self.preview_label.config(image=self.preview_image, text="")
+            self.preview_source = source
         except Exception as e:
             self.preview_label.config(text=f"Preview error: {str(e)}")
             
@@ -201,6 +462,9 @@ class LVGLIconGenerator:
             return
             
         try:
+            # Read and check every setting (e.g. the chroma key entry) before any file is touched
+            codegen = self.make_codegen()
+            
             # Get output file
             output_path = filedialog.asksaveasfilename(
                 title="Save C File",
@@ -214,12 +478,18 @@ class LVGLIconGenerator:
             
             self.last_path = os.path.dirname(output_path)
                 
-            # Generate C file content
-            c_content = self.generate_c_content()
-            
-            # Write file
-            with open(output_path, 'w') as f:
-                f.write(c_content)
+            # Stream the C file to a temporary file next to the target and swap it in, so a
+            # failure partway through never clobbers an existing icon (LF line endings, as C
+            # toolchains expect)
+            tmp_path = output_path + '.tmp'
+            try:
+                with open(tmp_path, 'w', encoding='utf-8', newline='\n', buffering=1024 * 1024) as f:
+                    codegen.generate_c_stream(f)
+                os.replace(tmp_path, output_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
                 
             self.status_label.config(text=f"Generated: {os.path.basename(output_path)}")
             messagebox.showinfo("Success", f"C file generated successfully!\nSaved to: {output_path}")
@@ -227,149 +497,24 @@ class LVGLIconGenerator:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to generate C file: {str(e)}")
             
+    def make_codegen(self):
+        """Snapshot the current settings into an IconCodegen"""
+        chroma_key = int(self.chroma_key_value.get(), 16) if self.use_chroma_key.get() else None
+        return IconCodegen(
+            self.icon_name.get(),
+            self.image_width.get(),
+            self.image_height.get(),
+            self.input_data,
+            a8r3g3b2=self.f_a8r3g3b2.get(),
+            a8r5g6b5=self.f_a8r5g6b5.get(),
+            a8r5g6b5_swap=self.f_a8r5g6b5_swap.get(),
+            r8g8b8a8=self.f_r8g8b8a8.get(),
+            chroma_key=chroma_key,
+        )
+        
     def generate_c_content(self):
         """Generate the complete C file content"""
-        icon_name = self.icon_name.get()
-        width = self.image_width.get()
-        height = self.image_height.get()
-
-        # Always use LV_IMG_CF_TRUE_COLOR_ALPHA for consistency with manufacturer files
-        # The actual transparency/chroma key is handled by the pixel data and render settings
-        cf = "LV_IMG_CF_TRUE_COLOR_ALPHA"
-
-        data_size = f"{width} * {height} * LV_IMG_PX_SIZE_ALPHA_BYTE"
-
-        # Header
-        content = f'''#ifdef LV_LVGL_H_INCLUDE_SIMPLE
-#include "lvgl.h"
-#else
-#include "lvgl/lvgl.h"
-#endif
-
-#ifndef LV_ATTRIBUTE_MEM_ALIGN
-#define LV_ATTRIBUTE_MEM_ALIGN
-#endif
-#ifndef LV_ATTRIBUTE_IMG_{icon_name.upper()}
-#define LV_ATTRIBUTE_IMG_{icon_name.upper()}
-#endif
-const LV_ATTRIBUTE_MEM_ALIGN LV_ATTRIBUTE_IMG_{icon_name.upper()} uint8_t {icon_name}_map[] = {{
-'''
-        
-        # Generate data for different color depths
-        content += self.generate_color_depth_data()
-        
-        # Footer
-        content += f'''}};
-
-const lv_img_dsc_t {icon_name} = {{
-  .header.cf = {cf},
-  .header.always_zero = 0,
-  .header.reserved = 0,
-  .header.w = {width},
-  .header.h = {height},
-  .data_size = {data_size},
-  .data = {icon_name}_map,
-}};
-'''
-        
-        return content
-        
-    def generate_color_depth_data(self):
-        """Generate pixel data for different color depths"""
-        width = self.image_width.get()
-        height = self.image_height.get()
-        use_chroma_key = self.use_chroma_key.get()
-        chroma_key_value = int(self.chroma_key_value.get(), 16)
-        
-        # Ensure we have enough pixel data
-        pixel_count = width * height
-        if len(self.input_data) < pixel_count:
-            # Pad with transparent pixels
-            self.input_data.extend([(0, 0, 0, 0)] * (pixel_count - len(self.input_data)))
-        else:
-            # Truncate if too many
-            self.input_data = self.input_data[:pixel_count]
-            
-        content = ""
-
-        if self.f_a8r3g3b2.get():
-            content += "#if LV_COLOR_DEPTH == 1 || LV_COLOR_DEPTH == 8\n"
-            content += "  /*Pixel format: Alpha 8 bit, Red: 3 bit, Green: 3 bit, Blue: 2 bit*/\n"
-            data = []
-            for r, g, b, a in self.input_data:
-                r3 = (r >> 5) & 0x7
-                g3 = (g >> 5) & 0x7
-                b2 = (b >> 6) & 0x3
-                color = (r3 << 5) | (g3 << 2) | b2
-                if use_chroma_key and color == chroma_key_value:
-                    data.extend([0x00, 0x00])
-                else:
-                    data.extend([color, a])
-            content += self.format_byte_array(data, width * 2)
-            content += "\n#endif\n\n"
-
-        if self.f_a8r5g6b5.get():
-            content += "#if LV_COLOR_DEPTH == 16 && LV_COLOR_16_SWAP == 0\n"
-            content += "  /*Pixel format: Alpha 8 bit, Red: 5 bit, Green: 6 bit, Blue: 5 bit*/\n"
-            data = []
-            for r, g, b, a in self.input_data:
-                r5 = (r >> 3) & 0x1F
-                g6 = (g >> 2) & 0x3F
-                b5 = (b >> 3) & 0x1F
-                rgb565 = (r5 << 11) | (g6 << 5) | b5
-                if use_chroma_key and rgb565 == chroma_key_value:
-                    data.extend([0x00, 0x00, 0x00])
-                else:
-                    data.append(rgb565 & 0xFF)
-                    data.append((rgb565 >> 8) & 0xFF)
-                    data.append(a)
-            content += self.format_byte_array(data, width * 3)
-            content += "\n#endif\n\n"
-
-        if self.f_a8r5g6b5_swap.get():
-            content += "#if LV_COLOR_DEPTH == 16 && LV_COLOR_16_SWAP != 0\n"
-            content += "  /*Pixel format: Alpha 8 bit, Red: 5 bit, Green: 6 bit, Blue: 5 bit, SWAPPED*/\n"
-            data = []
-            for r, g, b, a in self.input_data:
-                r5 = (r >> 3) & 0x1F
-                g6 = (g >> 2) & 0x3F
-                b5 = (b >> 3) & 0x1F
-                rgb565 = (r5 << 11) | (g6 << 5) | b5
-                if use_chroma_key and rgb565 == chroma_key_value:
-                    data.extend([0x00, 0x00, 0x00])
-                else:
-                    data.append((rgb565 >> 8) & 0xFF)
-                    data.append(rgb565 & 0xFF)
-                    data.append(a)
-            content += self.format_byte_array(data, width * 3)
-            content += "\n#endif\n\n"
-
-        if self.f_r8g8b8a8.get():
-            content += "#if LV_COLOR_DEPTH == 32\n"
-            content += "  /*Pixel format: Red: 8 bit, Green: 8 bit, Blue: 8 bit, Alpha: 8 bit*/\n"
-            data = []
-            for r, g, b, a in self.input_data:
-                val = (r << 24) | (g << 16) | (b << 8) | a
-                if use_chroma_key and val == chroma_key_value:
-                    data.extend([0x00, 0x00, 0x00, 0x00])
-                else:
-                    data.extend([r, g, b, a])
-            content += self.format_byte_array(data, width * 4)
-            content += "\n#endif\n\n"
-        
-        return content
-        
-    def format_byte_array(self, data, width):
-        """Format byte array as C code"""
-        lines = []
-        for i in range(0, len(data), width):
-            line = "  "
-            chunk = data[i:i + width]
-            line += ", ".join([f"0x{byte:02x}" for byte in chunk])
-            if i + width < len(data):
-                line += ","
-            lines.append(line)
-        return "\n".join(lines)
+        return self.make_codegen().generate_c_content()
 
 def main():
     root = tk.Tk()
@@ -9,68 +9,23 @@ Usage:
     python3 generator_cli.py --name icon_name --width 76 --height 76 --data "0xff,0x00,0x00,0xff,..."
     python3 generator_cli.py --name icon_name --width 76 --height 76 --file input.txt
     python3 generator_cli.py --example
+    python3 generator_cli.py --example --depth 16 --depth 32
 """
 
 import argparse
 import sys
 import os
+import itertools
+import struct
 
-def parse_hex_data(data_str, format_type='RGBA'):
-    """Parse hex data string into RGBA tuples"""
-    # Clean up the input
-    data_str = data_str.replace(',', ' ').replace('0x', '').replace(' ', ' ')
-    hex_values = [h for h in data_str.split() if h]
-    
-    bytes_per_pixel = 4 if format_type == 'RGBA' else 3
-    
-    if len(hex_values) % bytes_per_pixel != 0:
-        raise ValueError(f"Pixel data must be in {format_type} format ({bytes_per_pixel} bytes per pixel), got {len(hex_values)} values")
-    
-    pixel_data = []
-    for i in range(0, len(hex_values), bytes_per_pixel):
-        r = int(hex_values[i], 16)
-        g = int(hex_values[i+1], 16)
-        b = int(hex_values[i+2], 16)
-        
-        if format_type == 'RGBA':
-            a = int(hex_values[i+3], 16)
-        else:  # RGB
-            a = 0xFF  # Full alpha
-        
-        pixel_data.append((r, g, b, a))
-    
-    return pixel_data
+# LV_COLOR_DEPTH variants that can be emitted (depth 1 shares the 8-bit data)
+COLOR_DEPTHS = (8, 16, 24, 32)
 
-def create_example_data():
-    """Create example red square data"""
-    width, height = 32, 32
-    data = []
-    
-    for y in range(height):
-        for x in range(width):
-            if x < 4 or x >= width-4 or y < 4 or y >= height-4:
-                # Transparent border
-                data.extend([0x00, 0x00, 0x00, 0x00])
-            else:
-                # Red square
-                data.extend([0xff, 0x00, 0x00, 0xff])
-    
-    return data, width, height
+# format_byte_array: 24 bytes per line, every line ends with a comma
+_BYTES_PER_LINE = 24
 
-def generate_c_file(icon_name, width, height, pixel_data, output_file):
-    """Generate the complete C file"""
-    
-    # Ensure we have enough pixel data
-    pixel_count = width * height
-    if len(pixel_data) < pixel_count:
-        # Pad with transparent pixels
-        pixel_data.extend([(0, 0, 0, 0)] * (pixel_count - len(pixel_data)))
-    else:
-        # Truncate if too many
-        pixel_data = pixel_data[:pixel_count]
-    
-    # Header
-    content = f'''#ifdef LV_LVGL_H_INCLUDE_SIMPLE
+# C source wrapped around the pixel data, filled in with str.format
+_C_HEADER = '''#ifdef LV_LVGL_H_INCLUDE_SIMPLE
 #include "lvgl.h"
 #else
 #include "lvgl/lvgl.h"
@@ -79,124 +34,222 @@ def generate_c_file(icon_name, width, height, pixel_data, output_file):
 #ifndef LV_ATTRIBUTE_MEM_ALIGN
 #define LV_ATTRIBUTE_MEM_ALIGN
 #endif
-#ifndef LV_ATTRIBUTE_IMG_{icon_name.upper()}
-#define LV_ATTRIBUTE_IMG_{icon_name.upper()}
+#ifndef LV_ATTRIBUTE_IMG_{NAME}
+#define LV_ATTRIBUTE_IMG_{NAME}
 #endif
-const LV_ATTRIBUTE_MEM_ALIGN LV_ATTRIBUTE_IMG_{icon_name.upper()} uint8_t {icon_name}_map[] = {{
+const LV_ATTRIBUTE_MEM_ALIGN LV_ATTRIBUTE_IMG_{NAME} uint8_t {name}_map[] = {{
 '''
-    
-    # Generate data for different color depths
-    content += generate_color_depth_data(pixel_data)
-    
-    # Footer
-    content += f'''}};
 
-const lv_img_dsc_t {icon_name} = {{
-  .header.cf = LV_IMG_CF_TRUE_COLOR_ALPHA,
+_C_FOOTER = '''}};
+
+const lv_img_dsc_t {name} = {{
+  .header.cf = {cf},
   .header.always_zero = 0,
   .header.reserved = 0,
   .header.w = {width},
   .header.h = {height},
   .data_size = {width} * {height} * LV_IMG_PX_SIZE_ALPHA_BYTE,
-  .data = {icon_name}_map,
+  .data = {name}_map,
 }};
 '''
+
+# Lookup tables mapping an 8-bit channel to its bit field in the packed pixel
+# A8R3G3B2 colour byte: RRRGGGBB
+_A8R3G3B2_R = bytes(v & 0xE0 for v in range(256))
+_A8R3G3B2_G = bytes((v >> 5) << 2 for v in range(256))
+_A8R3G3B2_B = bytes(v >> 6 for v in range(256))
+# RGB565 low byte: GGGBBBBB, high byte: RRRRRGGG
+_RGB565_LO_G = bytes(((v >> 2) << 5) & 0xFF for v in range(256))
+_RGB565_LO_B = bytes(v >> 3 for v in range(256))
+_RGB565_HI_R = bytes(v & 0xF8 for v in range(256))
+_RGB565_HI_G = bytes(v >> 5 for v in range(256))
+# Alpha -> 0xFF mask for pixels that are kept (alpha >= 128 / alpha >= 8), else 0x00
+_OPAQUE_128 = bytes(0xFF if v >= 128 else 0x00 for v in range(256))
+_OPAQUE_8 = bytes(0xFF if v >= 8 else 0x00 for v in range(256))
+
+def parse_hex_data(data_str, format_type='RGBA'):
+    """Parse hex data string into RGBA tuples"""
+    return list(struct.iter_unpack('BBBB', parse_hex_rgba(data_str, format_type)))
+
+def parse_hex_rgba(data_str, format_type='RGBA'):
+    """Parse hex data string into packed RGBA bytes"""
+    # Clean up the input
+    cleaned = data_str.replace(',', ' ').replace('0x', '').replace('0X', '')
+    try:
+        # bytes.fromhex skips the whitespace between two-digit tokens, so the
+        # usual input is decoded in one C pass without splitting it into strings
+        buf = bytes.fromhex(cleaned)
+    except ValueError:
+        # Single-digit (or malformed) tokens: convert them one by one
+        buf = bytes(int(h, 16) for h in cleaned.split())
+    
+    bytes_per_pixel = 4 if format_type == 'RGBA' else 3
     
-    # Write file
-    with open(output_file, 'w') as f:
-        f.write(content)
+    if len(buf) % bytes_per_pixel != 0:
+        raise ValueError(f"Pixel data must be in {format_type} format ({bytes_per_pixel} bytes per pixel), got {len(buf)} values")
     
-    return content
+    if format_type == 'RGBA':
+        return buf
+    # RGB: full alpha
+    return bytes(_interleave(buf[0::3], buf[1::3], buf[2::3], b'\xff' * (len(buf) // 3)))
 
-def generate_color_depth_data(pixel_data):
-    """Generate pixel data for different color depths"""
-    content = ""
+def create_example_data():
+    """Create example red square data"""
+    width, height = 32, 32
     
-    # LV_COLOR_DEPTH == 1 || LV_COLOR_DEPTH == 8
-    content += "#if LV_COLOR_DEPTH == 1 || LV_COLOR_DEPTH == 8\n"
-    content += "  /*Pixel format: Alpha 8 bit, Red: 3 bit, Green: 3 bit, Blue: 2 bit*/\n"
+    # Build the two distinct rows once: all transparent border, and border-red-border
+    border_row = bytes(4 * width)
+    square_row = bytes(16) + b'\xff\x00\x00\xff' * (width - 8) + bytes(16)
     
-    # Generate 8-bit indexed data
-    data_8bit = []
-    for r, g, b, a in pixel_data:
-        if a < 128:  # Transparent
-            data_8bit.append(0x00)
-        else:
-            # Convert to 8-bit: A8R3G3B2
-            r3 = (r >> 5) & 0x7
-            g3 = (g >> 5) & 0x7
-            b2 = (b >> 6) & 0x3
-            a8 = 0xFF if a >= 128 else 0x00
-            data_8bit.append(a8)
-            
-    content += format_byte_array(data_8bit)
-    content += "\n#endif\n\n"
+    # Stack them with bytes repetition (the top and bottom 4 rows are border)
+    data = border_row * 4 + square_row * (height - 8) + border_row * 4
     
-    # LV_COLOR_DEPTH == 16
-    content += "#if LV_COLOR_DEPTH == 16\n"
-    content += "  /*Pixel format: Alpha 8 bit, Red: 5 bit, Green: 6 bit, Blue: 5 bit*/\n"
+    # Same packed RGBA bytes as parse_hex_rgba
+    return data, width, height
+
+def generate_c_file(icon_name, width, height, pixel_data, output_file, depths=COLOR_DEPTHS):
+    """Generate the complete C file with the requested color depth variants"""
     
-    # Generate 16-bit RGB565 + Alpha data
-    data_16bit = []
-    for r, g, b, a in pixel_data:
-        if a < 8:  # Mostly transparent
-            data_16bit.extend([0x00, 0x00, 0x00])  # RGB565 + Alpha
-        else:
-            # Convert to RGB565
-            r5 = (r >> 3) & 0x1F
-            g6 = (g >> 2) & 0x3F
-            b5 = (b >> 3) & 0x1F
-            rgb565 = (r5 << 11) | (g6 << 5) | b5
-            
-            # Little endian
-            data_16bit.append(rgb565 & 0xFF)
-            data_16bit.append((rgb565 >> 8) & 0xFF)
-            data_16bit.append(a)
-            
-    content += format_byte_array(data_16bit)
-    content += "\n#endif\n\n"
+    # The first width * height pixels as packed RGBA, padded with transparent pixels;
+    # the caller's data is left untouched
+    size = width * height * 4
+    pixels = _rgba_bytes(pixel_data, width * height)
+    pixels += bytes(size - len(pixels))
     
-    # LV_COLOR_DEPTH == 24
-    content += "#if LV_COLOR_DEPTH == 24\n"
-    content += "  /*Pixel format: Red: 8 bit, Green: 8 bit, Blue: 8 bit*/\n"
+    # Stream the file section by section, so only one section's text is held at a time
+    # (LF line endings, as C toolchains expect)
+    with open(output_file, 'w', encoding='utf-8', newline='\n', buffering=1024 * 1024) as f:
+        written = f.write(_C_HEADER.format(name=icon_name, NAME=icon_name.upper()))
+        # Generate data for different color depths
+        for i, section in enumerate(_color_depth_sections(pixels, depths)):
+            if i:
+                written += f.write("\n")
+            written += f.write(section)
+        written += f.write(_C_FOOTER.format(name=icon_name, cf="LV_IMG_CF_TRUE_COLOR_ALPHA", width=width, height=height))
     
-    # Generate 24-bit RGB data
-    data_24bit = []
-    for r, g, b, a in pixel_data:
-        if a < 128:  # Transparent
-            data_24bit.extend([0x00, 0x00, 0x00])
-        else:
-            data_24bit.extend([r, g, b])
+    # Number of characters written
+    return written
+
+def generate_color_depth_data(pixel_data, depths=COLOR_DEPTHS):
+    """Generate pixel data for the selected color depths"""
+    # Packed RGBA once (bytes pass through); each section then works on whole channel planes
+    pixels = _rgba_bytes(pixel_data, len(pixel_data))
+    return "\n".join(_color_depth_sections(pixels, depths))
+
+def _color_depth_sections(pixels, depths):
+    """Yield the C text of each selected color depth section in turn, from packed RGBA bytes"""
+    # Split the channel planes once for all the sections that need them (32-bit does not)
+    if 8 in depths or 16 in depths or 24 in depths:
+        planes = pixels[0::4], pixels[1::4], pixels[2::4], pixels[3::4]
+    
+    if 8 in depths:
+        yield _depth_8bit(*planes)
+    if 16 in depths:
+        yield _depth_16bit(*planes)
+    if 24 in depths:
+        yield _depth_24bit(*planes)
+    if 32 in depths:
+        yield _depth_32bit(pixels)
+
+def _rgba_bytes(pixel_data, count):
+    """Return the first count pixels as packed RGBA bytes (accepts bytes or a sequence of RGBA tuples)"""
+    if isinstance(pixel_data, (bytes, bytearray, memoryview)):
+        return bytes(pixel_data[:count * 4])
+    # Flatten straight from the tuples, without copying the list first
+    return bytes(itertools.chain.from_iterable(itertools.islice(pixel_data, count)))
+
+def _interleave(*planes):
+    """Interleave equally sized byte planes, one byte per plane per pixel"""
+    step = len(planes)
+    out = bytearray(len(planes[0]) * step)
+    for i, plane in enumerate(planes):
+        out[i::step] = plane
+    return out
+
+def _or_planes(*planes):
+    """Bitwise OR byte planes together (on big ints, so it runs in C)"""
+    acc = 0
+    for plane in planes:
+        acc |= int.from_bytes(plane, 'little')
+    return acc.to_bytes(len(planes[0]), 'little')
+
+def _and_planes(*planes):
+    """Bitwise AND byte planes together"""
+    acc = int.from_bytes(planes[0], 'little')
+    for plane in planes[1:]:
+        acc &= int.from_bytes(plane, 'little')
+    return acc.to_bytes(len(planes[0]), 'little')
+
+def _mask_planes(mask, *planes):
+    """AND each byte plane with the same mask plane (the mask is converted to an int only once)"""
+    m = int.from_bytes(mask, 'little')
+    size = len(mask)
+    return [(int.from_bytes(plane, 'little') & m).to_bytes(size, 'little') for plane in planes]
+
+def _depth_8bit(r, g, b, a):
+    """LV_COLOR_DEPTH == 1 || LV_COLOR_DEPTH == 8"""
+    parts = ["#if LV_COLOR_DEPTH == 1 || LV_COLOR_DEPTH == 8\n"]
+    parts.append("  /*Pixel format: Alpha 8 bit, Red: 3 bit, Green: 3 bit, Blue: 2 bit*/\n")
+    
+    # Colour byte RRRGGGBB followed by the alpha byte (0xFF, or 0x00, 0x00 if transparent)
+    opaque = a.translate(_OPAQUE_128)
+    color = _or_planes(
+        r.translate(_A8R3G3B2_R),
+        g.translate(_A8R3G3B2_G),
+        b.translate(_A8R3G3B2_B),
+    )
+    data_8bit = _interleave(_and_planes(color, opaque), opaque)
             
-    content += format_byte_array(data_24bit)
-    content += "\n#endif\n\n"
+    parts.append(format_byte_array(data_8bit))
+    parts.append("\n#endif\n")
+    return "".join(parts)
+
+def _depth_16bit(r, g, b, a):
+    """LV_COLOR_DEPTH == 16"""
+    parts = ["#if LV_COLOR_DEPTH == 16\n"]
+    parts.append("  /*Pixel format: Alpha 8 bit, Red: 5 bit, Green: 6 bit, Blue: 5 bit*/\n")
     
-    # LV_COLOR_DEPTH == 32
-    content += "#if LV_COLOR_DEPTH == 32\n"
-    content += "  /*Pixel format: Red: 8 bit, Green: 8 bit, Blue: 8 bit, Alpha: 8 bit*/\n"
+    # RGB565 little endian + alpha; mostly transparent pixels are all zero
+    visible = a.translate(_OPAQUE_8)
+    lo = _or_planes(g.translate(_RGB565_LO_G), b.translate(_RGB565_LO_B))
+    hi = _or_planes(r.translate(_RGB565_HI_R), g.translate(_RGB565_HI_G))
+    data_16bit = _interleave(*_mask_planes(visible, lo, hi, a))
+            
+    parts.append(format_byte_array(data_16bit))
+    parts.append("\n#endif\n")
+    return "".join(parts)
+
+def _depth_24bit(r, g, b, a):
+    """LV_COLOR_DEPTH == 24"""
+    parts = ["#if LV_COLOR_DEPTH == 24\n"]
+    parts.append("  /*Pixel format: Red: 8 bit, Green: 8 bit, Blue: 8 bit*/\n")
     
-    # Generate 32-bit RGBA data
-    data_32bit = []
-    for r, g, b, a in pixel_data:
-        data_32bit.extend([r, g, b, a])
-        
-    content += format_byte_array(data_32bit)
-    content += "\n#endif\n"
+    # RGB, black where transparent
+    opaque = a.translate(_OPAQUE_128)
+    data_24bit = _interleave(*_mask_planes(opaque, r, g, b))
+            
+    parts.append(format_byte_array(data_24bit))
+    parts.append("\n#endif\n")
+    return "".join(parts)
+
+def _depth_32bit(pixels):
+    """LV_COLOR_DEPTH == 32"""
+    parts = ["#if LV_COLOR_DEPTH == 32\n"]
+    parts.append("  /*Pixel format: Red: 8 bit, Green: 8 bit, Blue: 8 bit, Alpha: 8 bit*/\n")
+    
+    # Already RGBA
+    parts.append(format_byte_array(pixels))
+    parts.append("\n#endif\n")
     
-    return content
+    return "".join(parts)
 
 def format_byte_array(data):
     """Format byte array as C code"""
-    lines = []
-    for i in range(0, len(data), 24):  # 24 bytes per line
-        line = "  "
-        for j in range(i, min(i + 24, len(data))):
-            line += f"0x{data[j]:02x}"
-            if j < min(i + 24, len(data)) - 1:
-                line += ", "
-        line += ","
-        lines.append(line)
-        
+    # memoryview.hex() formats a whole line in C, on a zero-copy window of the buffer;
+    # the separators are spliced in afterwards
+    data = memoryview(data if isinstance(data, (bytes, bytearray)) else bytes(data))
+    lines = ["  0x" + data[i:i + _BYTES_PER_LINE].hex(" ").replace(" ", ", 0x") + ","
+             for i in range(0, len(data), _BYTES_PER_LINE)]
     return "\n".join(lines)
 
 def main():
@@ -209,24 +262,29 @@ def main():
     parser.add_argument('--format', choices=['RGB', 'RGBA'], default='RGBA', help='Pixel format (default: RGBA)')
     parser.add_argument('--output', help='Output C file (default: {name}.c)')
     parser.add_argument('--example', action='store_true', help='Generate example red square icon')
+    parser.add_argument('--depth', type=int, action='append', choices=[1, 8, 16, 24, 32],
+                        help='LV_COLOR_DEPTH to emit; repeat for several (default: all)')
     
     args = parser.parse_args()
     
+    # Depth 1 uses the same data as depth 8
+    depths = {8 if d == 1 else d for d in args.depth} if args.depth else COLOR_DEPTHS
+    
     try:
         # Handle example generation
         if args.example:
-            data, width, height = create_example_data()
+            pixel_data, width, height = create_example_data()
             icon_name = "icon_example"
             output_file = args.output or "icon_example.c"
             print(f"Generating example red square icon ({width}x{height})...")
         else:
             # Parse pixel data
             if args.data:
-                data = parse_hex_data(args.data, args.format)
+                pixel_data = parse_hex_rgba(args.data, args.format)
             elif args.file:
                 with open(args.file, 'r') as f:
                     data_str = f.read().strip()
-                data = parse_hex_data(data_str, args.format)
+                pixel_data = parse_hex_rgba(data_str, args.format)
             else:
                 print("Error: Must provide --data, --file, or --example")
                 return 1
@@ -240,19 +298,13 @@ def main():
             height = args.height
             output_file = args.output or f"{icon_name}.c"
         
-        # Convert to RGBA tuples
-        pixel_data = []
-        for i in range(0, len(data), 4):
-            if i + 3 < len(data):
-                pixel_data.append((data[i], data[i+1], data[i+2], data[i+3]))
-        
         # Generate C file
-        content = generate_c_file(icon_name, width, height, pixel_data, output_file)
+        size = generate_c_file(icon_name, width, height, pixel_data, output_file, depths)
         
         print(f"Generated {output_file}")
         print(f"Icon: {icon_name} ({width}x{height})")
-        print(f"File size: {len(content)} characters")
-        print(f"Pixels: {len(pixel_data)}")
+        print(f"File size: {size} characters")
+        print(f"Pixels: {len(pixel_data) // 4}")
         
         # Show usage instructions
         print(f"\nUsage in your LVGL project:")
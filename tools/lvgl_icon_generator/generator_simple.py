@@ -11,26 +11,141 @@ Usage:
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-import struct
 import os
 import sys
+import io
+import re
 try:
     from PIL import Image, ImageTk
     PIL_AVAILABLE = True
 except ImportError:
     PIL_AVAILABLE = False
 
+# LV_COLOR_DEPTH variants that can be emitted (depth 1 shares the 8-bit data)
+COLOR_DEPTHS = (8, 16, 24, 32)
+
+# format_byte_array: 24 bytes per line, every line ends with a comma
+_BYTES_PER_LINE = 24
+# write_byte_array: lines formatted and written per block (about 64 KiB of text)
+_LINES_PER_WRITE = 448
+
+# Larger examples are only shown in part in the raw data text box (see load_example_data)
+_EXAMPLE_TEXT_BYTES = 1024
+
+# C source wrapped around the pixel data, filled in with str.format
+_C_HEADER = '''#ifdef LV_LVGL_H_INCLUDE_SIMPLE
+#include "lvgl.h"
+#else
+#include "lvgl/lvgl.h"
+#endif
+
+#ifndef LV_ATTRIBUTE_MEM_ALIGN
+#define LV_ATTRIBUTE_MEM_ALIGN
+#endif
+#ifndef LV_ATTRIBUTE_IMG_{NAME}
+#define LV_ATTRIBUTE_IMG_{NAME}
+#endif
+const LV_ATTRIBUTE_MEM_ALIGN LV_ATTRIBUTE_IMG_{NAME} uint8_t {name}_map[] = {{
+'''
+
+_C_FOOTER = '''}};
+
+const lv_img_dsc_t {name} = {{
+  .header.cf = {cf},
+  .header.always_zero = 0,
+  .header.reserved = 0,
+  .header.w = {width},
+  .header.h = {height},
+  .data_size = {width} * {height} * LV_IMG_PX_SIZE_ALPHA_BYTE,
+  .data = {name}_map,
+}};
+'''
+
+# Lookup tables mapping an 8-bit channel to its bit field in the packed pixel
+# A8R3G3B2 colour byte: RRRGGGBB
+_A8R3G3B2_R = bytes(v & 0xE0 for v in range(256))
+_A8R3G3B2_G = bytes((v >> 5) << 2 for v in range(256))
+_A8R3G3B2_B = bytes(v >> 6 for v in range(256))
+# RGB565 low byte: GGGBBBBB, high byte: RRRRRGGG
+_RGB565_LO_G = bytes(((v >> 2) << 5) & 0xFF for v in range(256))
+_RGB565_LO_B = bytes(v >> 3 for v in range(256))
+_RGB565_HI_R = bytes(v & 0xF8 for v in range(256))
+_RGB565_HI_G = bytes(v >> 5 for v in range(256))
+# ...and back: the 8-bit channel bits each RGB565 byte contributes. The top bits
+# are replicated into the empty low bits, so 0x1F/0x3F expand to 0xFF, not 0xF8/0xFC
+_RGB565_TO_R = bytes((v & 0xF8) | (v >> 5) for v in range(256))                # high byte
+_RGB565_TO_G_HI = bytes(((v & 0x07) << 5) | ((v & 0x07) >> 1) for v in range(256))  # high byte
+_RGB565_TO_G_LO = bytes((v >> 5) << 2 for v in range(256))                      # low byte
+_RGB565_TO_B = bytes((((v & 0x1F) << 3) & 0xFF) | ((v & 0x1F) >> 2) for v in range(256))  # low byte
+# 8-bit channel after a round trip through 5 or 6 bits, expanded the same way
+_ROUND_TRIP_5 = bytes((v & 0xF8) | (v >> 5) for v in range(256))
+_ROUND_TRIP_6 = bytes((v & 0xFC) | (v >> 6) for v in range(256))
+_IDENTITY = bytes(range(256))
+# Red, green and blue tables for each preview format (RGB24 keeps the channels as they are)
+_PREVIEW_TABLES = {
+    "RGB565": (_ROUND_TRIP_5, _ROUND_TRIP_6, _ROUND_TRIP_5),
+    "RGB565_SWAP": (_ROUND_TRIP_5, _ROUND_TRIP_6, _ROUND_TRIP_5),
+}
+# Alpha -> 0xFF mask for pixels that are kept (alpha >= 128 / alpha >= 8), else 0x00
+_OPAQUE_128 = bytes(0xFF if v >= 128 else 0x00 for v in range(256))
+_OPAQUE_8 = bytes(0xFF if v >= 8 else 0x00 for v in range(256))
+_OPAQUE_255 = bytes(0xFF if v == 255 else 0x00 for v in range(256))
+# ASCII preview characters: transparent (alpha < 64) and semi-transparent (alpha < 128) by
+# alpha, the rest by the brightness sum r + g + b: dark, medium, bright ((r + g + b) / 3 < 85, < 170)
+_TEXT_ALPHA = (" ",) * 64 + (".",) * 64 + ("",) * 128
+_TEXT_SHADE = "#" * 255 + "+" * 255 + "*" * 256
+# Alpha values the preview blends with black (fully opaque pixels are copied as they are)
+_PARTIAL_ALPHA = re.compile(rb'[\x80-\xfe]')
+
+def _interleave(*planes):
+    """Interleave equally sized byte planes, one byte per plane per pixel"""
+    step = len(planes)
+    out = bytearray(len(planes[0]) * step)
+    for i, plane in enumerate(planes):
+        out[i::step] = plane
+    return out
+
+def _or_planes(*planes):
+    """Bitwise OR byte planes together (on big ints, so it runs in C)"""
+    acc = 0
+    for plane in planes:
+        acc |= int.from_bytes(plane, 'little')
+    return acc.to_bytes(len(planes[0]), 'little')
+
+def _and_planes(*planes):
+    """Bitwise AND byte planes together"""
+    acc = int.from_bytes(planes[0], 'little')
+    for plane in planes[1:]:
+        acc &= int.from_bytes(plane, 'little')
+    return acc.to_bytes(len(planes[0]), 'little')
+
+def _mask_planes(mask, *planes):
+    """AND each byte plane with the same mask plane (the mask is converted to an int only once)"""
+    m = int.from_bytes(mask, 'little')
+    size = len(mask)
+    return [(int.from_bytes(plane, 'little') & m).to_bytes(size, 'little') for plane in planes]
+
 class SimpleLVGLIconGenerator:
     def __init__(self, root):
         self.root = root
         self.root.title("LVGL Icon Generator - Simple Version")
-        self.root.geometry("1000x600")
+        self.root.geometry("1000x660")
         
         # Variables
-        self.input_data = []
+        self.input_data = b""
+        # Bytes behind the example text, used by parse_raw_data while the text is unedited
+        self.example_data = None
+        # Rendered previews of preview_cache_data, keyed by (format, width, height), so
+        # switching the preview format back and forth does not convert the data again
+        self.preview_cache = {}
+        self.preview_cache_data = None
+        # Pending root.after() call of render_preview, if any
+        self.pending_preview = None
         self.icon_name = tk.StringVar(value="icon_example")
         self.image_width = tk.IntVar(value=76)
         self.image_height = tk.IntVar(value=76)
+        # Color depths written to the C file; untick the ones the firmware does not use
+        self.target_depths = {depth: tk.BooleanVar(value=True) for depth in COLOR_DEPTHS}
         self.last_path = os.getcwd()
         
         self.setup_ui()
@@ -101,7 +216,10 @@ class SimpleLVGLIconGenerator:
         ttk.Button(button_frame, text="Clear Data", command=self.clear_data).grid(row=0, column=1, padx=(0, 10))
         
         # Parse button
-        ttk.Button(button_frame, text="Parse Pixel Data", command=self.parse_raw_data).grid(row=0, column=2)
+        ttk.Button(button_frame, text="Parse Pixel Data", command=self.parse_raw_data).grid(row=0, column=2, padx=(0, 10))
+        
+        # Show all button (for an abridged example)
+        ttk.Button(button_frame, text="Show All Data", command=self.show_all_data).grid(row=0, column=3)
         
         # Status
         self.status_label = ttk.Label(main_frame, text="Ready - Enter pixel data in hex format (e.g., 0xff, 0x00, 0x00, 0xff)")
@@ -125,8 +243,16 @@ class SimpleLVGLIconGenerator:
         self.preview_label = ttk.Label(preview_frame, text="No preview available")
         self.preview_label.grid(row=1, column=0, columnspan=2, pady=10)
         
+        # Color depth selection
+        depths_frame = ttk.LabelFrame(main_frame, text="LV_COLOR_DEPTH Variants", padding="5")
+        depths_frame.grid(row=6, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
+        
+        depth_labels = {8: "1/8-bit (A8R3G3B2)", 16: "16-bit (RGB565 + Alpha)", 24: "24-bit (RGB888)", 32: "32-bit (RGBA8888)"}
+        for i, depth in enumerate(COLOR_DEPTHS):
+            ttk.Checkbutton(depths_frame, text=depth_labels[depth], variable=self.target_depths[depth]).grid(row=0, column=i, sticky=tk.W, padx=(0, 20))
+        
         # Generate button
-        ttk.Button(main_frame, text="Generate C File", command=self.generate_c_file).grid(row=6, column=0, columnspan=2, pady=20)
+        ttk.Button(main_frame, text="Generate C File", command=self.generate_c_file).grid(row=7, column=0, columnspan=2, pady=20)
         
     def load_example_data(self):
         """Load example pixel data for a simple red square"""
@@ -134,42 +260,78 @@ class SimpleLVGLIconGenerator:
         height = self.image_height.get()
         
         # Create a simple red square with transparent border
-        example_data = []
+        # Only two distinct rows exist: all border, and border-red-border
+        border = min(4, width)
+        red = max(0, width - 8)
+        border_row = bytes(4 * width)
+        square_row = bytes(4 * border) + b'\xff\x00\x00\xff' * red + bytes(4 * (width - border - red))
+        
+        # Stack them with bytes repetition (the top and bottom 4 rows are border)
+        if height > 8:
+            example_data = border_row * 4 + square_row * (height - 8) + border_row * 4
+        else:
+            example_data = border_row * height
         
-        for y in range(height):
-            for x in range(width):
-                if x < 4 or x >= width-4 or y < 4 or y >= height-4:
-                    # Transparent border
-                    example_data.extend([0x00, 0x00, 0x00, 0x00])
-                else:
-                    # Red square
-                    example_data.extend([0xff, 0x00, 0x00, 0xff])
+        # Keep the bytes and only format the start of a large example as hex: megabytes
+        # of text make the Text widget slow, and parse_raw_data does not need them
+        self.example_data = example_data
+        self.show_example_text(example_data[:_EXAMPLE_TEXT_BYTES])
         
-        # Format as hex string
-        hex_data = ", ".join([f"0x{b:02x}" for b in example_data])
+        self.status_label.config(text=f"Loaded example red square data ({width}x{height})")
         
+    def show_all_data(self):
+        """Show the whole example data as hex text"""
+        if self.example_data is not None:
+            self.show_example_text(self.example_data)
+            
+    def show_example_text(self, data):
+        """Put the example data as hex in the raw data text box, noting any bytes left out"""
+        hex_data = "0x" + data.hex(" ").replace(" ", ", 0x") if data else ""
+        abridged = len(data) < len(self.example_data)
+        if abridged:
+            hex_data += f"\n... ({len(self.example_data)} bytes total, read-only: press Show All Data to edit them)"
+        
+        self.raw_data_text.config(state=tk.NORMAL)
         self.raw_data_text.delete(1.0, tk.END)
         self.raw_data_text.insert(1.0, hex_data)
-        
-        self.status_label.config(text=f"Loaded example red square data ({width}x{height})")
+        # Unedited text stands for example_data
+        self.raw_data_text.edit_modified(False)
+        # Abridged text cannot be parsed back into the whole example, so it stays read-only
+        # until Show All Data puts every byte in the box
+        if abridged:
+            self.raw_data_text.config(state=tk.DISABLED)
         
     def clear_data(self):
         """Clear the raw data text area"""
+        self.raw_data_text.config(state=tk.NORMAL)
         self.raw_data_text.delete(1.0, tk.END)
-        self.input_data = []
+        self.input_data = b""
+        self.example_data = None
+        self.preview_cache.clear()
+        self.preview_cache_data = None
         self.status_label.config(text="Data cleared")
         
     def parse_raw_data(self):
         """Parse raw pixel data from text input"""
         try:
-            text = self.raw_data_text.get(1.0, tk.END).strip()
-            if not text:
-                messagebox.showwarning("Warning", "No raw data entered")
-                return
-                
-            # Parse hex data
-            hex_data = text.replace(',', ' ').replace('0x', '').split()
-            pixel_data = [int(h, 16) for h in hex_data if h]
+            if self.example_data is not None and not self.raw_data_text.edit_modified():
+                # The text still shows the example: use its bytes, no hex parsing needed
+                pixel_data = self.example_data
+            else:
+                text = self.raw_data_text.get(1.0, tk.END).strip()
+                if not text:
+                    messagebox.showwarning("Warning", "No raw data entered")
+                    return
+                    
+                # Parse hex data
+                cleaned = text.replace(',', ' ').replace('0x', '').replace('0X', '')
+                try:
+                    # bytes.fromhex skips the whitespace between two-digit tokens, so the
+                    # usual input is decoded in one C pass without splitting it into strings
+                    pixel_data = bytes.fromhex(cleaned)
+                except ValueError:
+                    # Single-digit (or malformed) tokens: convert them one by one
+                    pixel_data = bytes(int(h, 16) for h in cleaned.split())
             
             # Determine format and bytes per pixel
             input_format = self.input_format.get()
@@ -179,18 +341,19 @@ class SimpleLVGLIconGenerator:
                 messagebox.showerror("Error", f"Pixel data must be in {input_format} format ({bytes_per_pixel} bytes per pixel)")
                 return
                 
-            # Convert to RGBA tuples based on input format
+            # Convert to packed RGBA bytes based on input format
             self.input_data = self.convert_to_rgba(pixel_data, input_format)
+            pixel_count = len(self.input_data) // 4
             
             # Check size
             width = self.image_width.get()
             height = self.image_height.get()
             expected_size = width * height
             
-            if len(self.input_data) != expected_size:
-                messagebox.showwarning("Warning", f"Expected {expected_size} pixels, got {len(self.input_data)}")
+            if pixel_count != expected_size:
+                messagebox.showwarning("Warning", f"Expected {expected_size} pixels, got {pixel_count}")
                 
-            self.status_label.config(text=f"Parsed {len(self.input_data)} pixels successfully ({input_format} format)")
+            self.status_label.config(text=f"Parsed {pixel_count} pixels successfully ({input_format} format)")
             
             # Update preview after successful parsing
             self.update_preview()
@@ -210,53 +373,50 @@ class SimpleLVGLIconGenerator:
             return 4
             
     def convert_to_rgba(self, pixel_data, format_type):
-        """Convert pixel data to RGBA tuples based on input format"""
-        rgba_data = []
+        """Convert pixel data to packed RGBA bytes based on input format"""
+        rgba_data = b""
         
         if format_type == "RGBA_8888":
-            # R8G8B8A8
-            for i in range(0, len(pixel_data), 4):
-                rgba_data.append((pixel_data[i], pixel_data[i+1], pixel_data[i+2], pixel_data[i+3]))
+            # R8G8B8A8: already in the right layout
+            rgba_data = bytes(pixel_data[:len(pixel_data) - len(pixel_data) % 4])
                 
         elif format_type == "RGB_888":
             # R8G8B8 (add full alpha)
-            for i in range(0, len(pixel_data), 3):
-                rgba_data.append((pixel_data[i], pixel_data[i+1], pixel_data[i+2], 0xFF))
-                
-        elif format_type == "RGB565_ALPHA":
-            # R5G6B5A8 (little endian RGB565 + alpha)
-            for i in range(0, len(pixel_data), 3):
-                rgb565 = pixel_data[i] | (pixel_data[i+1] << 8)
-                alpha = pixel_data[i+2]
-                
-                # Extract RGB565 components
-                r = ((rgb565 >> 11) & 0x1F) << 3
-                g = ((rgb565 >> 5) & 0x3F) << 2
-                b = (rgb565 & 0x1F) << 3
-                
-                rgba_data.append((r, g, b, alpha))
+            data = bytes(pixel_data[:len(pixel_data) - len(pixel_data) % 3])
+            rgba_data = bytes(_interleave(data[0::3], data[1::3], data[2::3], b"\xff" * (len(data) // 3)))
                 
-        elif format_type == "RGB565_SWAP_ALPHA":
-            # B5G6R5A8 (swapped RGB565 + alpha)
-            for i in range(0, len(pixel_data), 3):
-                rgb565 = pixel_data[i] | (pixel_data[i+1] << 8)
-                alpha = pixel_data[i+2]
-                
-                # Extract swapped RGB565 components (BGR order)
-                b = ((rgb565 >> 11) & 0x1F) << 3
-                g = ((rgb565 >> 5) & 0x3F) << 2
-                r = (rgb565 & 0x1F) << 3
-                
-                rgba_data.append((r, g, b, alpha))
+        elif format_type in ("RGB565_ALPHA", "RGB565_SWAP_ALPHA"):
+            # R5G6B5A8 (little endian RGB565 + alpha), decoded plane by plane with lookup tables
+            data = bytes(pixel_data[:len(pixel_data) - len(pixel_data) % 3])
+            lo, hi, alpha = data[0::3], data[1::3], data[2::3]
+            r = hi.translate(_RGB565_TO_R)
+            g = _or_planes(hi.translate(_RGB565_TO_G_HI), lo.translate(_RGB565_TO_G_LO))
+            b = lo.translate(_RGB565_TO_B)
+            if format_type == "RGB565_SWAP_ALPHA":
+                # B5G6R5A8 (swapped RGB565 + alpha): red and blue trade places
+                r, b = b, r
+            rgba_data = bytes(_interleave(r, g, b, alpha))
                 
         return rgba_data
         
     def update_preview(self):
+        """Schedule a preview update; back-to-back requests (quick format clicks) render once"""
+        if self.pending_preview is not None:
+            self.root.after_cancel(self.pending_preview)
+        self.pending_preview = self.root.after(50, self.render_preview)
+        
+    def render_preview(self):
         """Update the preview image based on current data and format selection"""
+        self.pending_preview = None
         if not self.input_data:
             self.preview_label.config(text="No preview available")
             return
             
+        # New input data makes the cached previews stale
+        if self.preview_cache_data is not self.input_data:
+            self.preview_cache.clear()
+            self.preview_cache_data = self.input_data
+            
         if PIL_AVAILABLE:
             self.update_preview_pil()
         else:
@@ -268,24 +428,28 @@ class SimpleLVGLIconGenerator:
             width = self.image_width.get()
             height = self.image_height.get()
             
-            # Create preview data based on selected format
+            # Reuse the preview if this format was already rendered for the same data
             preview_format = self.preview_format.get()
-            preview_data = self.generate_preview_data(preview_format)
-            
-            # Create PIL image
-            img = Image.new('RGB', (width, height))
-            img.putdata(preview_data)
-            
-            # Resize for preview (max 200x200)
-            max_size = 200
-            if width > max_size or height > max_size:
-                scale = max_size / max(width, height)
-                new_width = int(width * scale)
-                new_height = int(height * scale)
-                img = img.resize((new_width, new_height), Image.LANCZOS)
-            
-            # Convert to PhotoImage
-            self.preview_image = ImageTk.PhotoImage(img)
+            key = (preview_format, width, height)
+            self.preview_image = self.preview_cache.get(key)
+            if self.preview_image is None:
+                # Create preview data based on selected format
+                preview_data = self.generate_preview_data(preview_format)
+                
+                # Create PIL image (missing pixels are black)
+                size = width * height * 3
+                img = Image.frombytes('RGB', (width, height), preview_data[:size].ljust(size, b'\0'))
+                
+                # Resize for preview (max 200x200; bilinear is plenty for a preview)
+                max_size = 200
+                if width > max_size or height > max_size:
+                    scale = max_size / max(width, height)
+                    new_width = int(width * scale)
+                    new_height = int(height * scale)
+                    img = img.resize((new_width, new_height), Image.BILINEAR)
+                
+                # Convert to PhotoImage
+                self.preview_image = self.preview_cache[key] = ImageTk.PhotoImage(img)
             self.preview_label.config(image=self.preview_image, text="")
             
         except Exception as e:
@@ -294,12 +458,12 @@ class SimpleLVGLIconGenerator:
     def update_preview_text(self):
         """Update preview using text representation (no PIL required)"""
         try:
-            width = self.image_width.get()
-            height = self.image_height.get()
-            
-            # Create ASCII art representation
+            # Create ASCII art representation (or reuse the one rendered for this format)
             preview_format = self.preview_format.get()
-            preview_text = self.generate_preview_text(preview_format)
+            key = (preview_format, self.image_width.get(), self.image_height.get())
+            preview_text = self.preview_cache.get(key)
+            if preview_text is None:
+                preview_text = self.preview_cache[key] = self.generate_preview_text(preview_format)
             
             # Update label with text preview
             self.preview_label.config(text=preview_text, font=("Courier", 8))
@@ -309,51 +473,32 @@ class SimpleLVGLIconGenerator:
             
     def generate_preview_data(self, preview_format):
         """Generate preview pixel data in the selected format (without alpha)"""
-        preview_data = []
-        
-        for r, g, b, a in self.input_data:
-            if preview_format == "RGB565":
-                # Convert to RGB565 (no alpha)
-                r5 = (r >> 3) & 0x1F
-                g6 = (g >> 2) & 0x3F
-                b5 = (b >> 3) & 0x1F
-                rgb565 = (r5 << 11) | (g6 << 5) | b5
-                
-                # Convert back to 24-bit for display
-                r_out = ((rgb565 >> 11) & 0x1F) << 3
-                g_out = ((rgb565 >> 5) & 0x3F) << 2
-                b_out = (rgb565 & 0x1F) << 3
-                
-            elif preview_format == "RGB565_SWAP":
-                # Convert to BGR565 (swapped, no alpha)
-                b5 = (b >> 3) & 0x1F
-                g6 = (g >> 2) & 0x3F
-                r5 = (r >> 3) & 0x1F
-                bgr565 = (b5 << 11) | (g6 << 5) | r5
-                
-                # Convert back to 24-bit for display (swapped back)
-                b_out = ((bgr565 >> 11) & 0x1F) << 3
-                g_out = ((bgr565 >> 5) & 0x3F) << 2
-                r_out = (bgr565 & 0x1F) << 3
-                
-            else:  # RGB24
-                # Use original RGB values (ignore alpha)
-                r_out = r
-                g_out = g
-                b_out = b
-            
-            # Apply alpha blending with black background for transparency
-            if a < 128:  # Transparent
-                preview_data.append((0, 0, 0))  # Black background
-            else:
-                # Blend with black background based on alpha
-                alpha_factor = a / 255.0
-                r_out = int(r_out * alpha_factor)
-                g_out = int(g_out * alpha_factor)
-                b_out = int(b_out * alpha_factor)
-                preview_data.append((r_out, g_out, b_out))
-        
-        return preview_data
+        # Packing to RGB565 (or its swapped form) and expanding back to 24-bit only
+        # depends on each channel's own value, so it is one table lookup per plane
+        r_table, g_table, b_table = _PREVIEW_TABLES.get(preview_format, (_IDENTITY,) * 3)
+        
+        data = self.input_data
+        r, g, b, a = data[0::4].translate(r_table), data[1::4].translate(g_table), data[2::4].translate(b_table), data[3::4]
+        
+        # Apply alpha blending with black background for transparency: fully opaque
+        # pixels keep their colour and alpha < 128 is black
+        preview_data = _interleave(*_mask_planes(a.translate(_OPAQUE_255), r, g, b))
+        
+        # Blend the partially transparent pixels with black, building one lookup table
+        # per alpha value instead of three float multiplications per pixel
+        rgb = _interleave(r, g, b)
+        blend_tables = {}
+        for match in _PARTIAL_ALPHA.finditer(a):
+            i = match.start()
+            table = blend_tables.get(a[i])
+            if table is None:
+                alpha_factor = a[i] / 255.0
+                table = blend_tables[a[i]] = bytes(int(c * alpha_factor) for c in range(256))
+            j = 3 * i
+            preview_data[j:j + 3] = rgb[j:j + 3].translate(table)
+        
+        # Packed RGB bytes, three per pixel
+        return bytes(preview_data)
         
     def generate_preview_text(self, preview_format):
         """Generate ASCII art preview of the icon"""
@@ -371,64 +516,38 @@ class SimpleLVGLIconGenerator:
         text_width = int(width * scale)
         text_height = int(height * scale)
         
+        # Plain locals for the per-character loop
+        input_data = self.input_data
+        pixel_total = len(input_data) // 4
+        r_table, g_table, b_table = _PREVIEW_TABLES.get(preview_format, (_IDENTITY,) * 3)
+        
         lines = []
         lines.append(f"Preview ({preview_format}): {width}x{height} -> {text_width}x{text_height}")
         lines.append("=" * (text_width + 2))
         
-        # Sample pixels for text representation
+        # Sample pixels for text representation; the sampled columns are the same for every row
+        xs = [int(x / scale) if scale < 1 else x for x in range(text_width)]
         for y in range(text_height):
-            line = "|"
-            for x in range(text_width):
+            orig_y = int(y / scale) if scale < 1 else y
+            row_start = orig_y * width
+            chars = []
+            for orig_x in xs:
                 # Map text coordinates back to original image
-                orig_x = int(x / scale) if scale < 1 else x
-                orig_y = int(y / scale) if scale < 1 else y
-                
                 if orig_x < width and orig_y < height:
-                    pixel_idx = orig_y * width + orig_x
-                    if pixel_idx < len(self.input_data):
-                        r, g, b, a = self.input_data[pixel_idx]
+                    pixel_idx = row_start + orig_x
+                    if pixel_idx < pixel_total:
+                        r, g, b, a = input_data[4 * pixel_idx:4 * pixel_idx + 4]
                         
-                        # Apply format conversion
-                        if preview_format == "RGB565":
-                            r5 = (r >> 3) & 0x1F
-                            g6 = (g >> 2) & 0x3F
-                            b5 = (b >> 3) & 0x1F
-                            rgb565 = (r5 << 11) | (g6 << 5) | b5
-                            r_out = ((rgb565 >> 11) & 0x1F) << 3
-                            g_out = ((rgb565 >> 5) & 0x3F) << 2
-                            b_out = (rgb565 & 0x1F) << 3
-                        elif preview_format == "RGB565_SWAP":
-                            b5 = (b >> 3) & 0x1F
-                            g6 = (g >> 2) & 0x3F
-                            r5 = (r >> 3) & 0x1F
-                            bgr565 = (b5 << 11) | (g6 << 5) | r5
-                            b_out = ((bgr565 >> 11) & 0x1F) << 3
-                            g_out = ((bgr565 >> 5) & 0x3F) << 2
-                            r_out = (bgr565 & 0x1F) << 3
-                        else:  # RGB24
-                            r_out, g_out, b_out = r, g, b
-                        
-                        # Choose character based on brightness and alpha
-                        if a < 64:
-                            char = " "  # Transparent
-                        elif a < 128:
-                            char = "."  # Semi-transparent
-                        else:
-                            brightness = (r_out + g_out + b_out) / 3
-                            if brightness < 85:
-                                char = "#"  # Dark
-                            elif brightness < 170:
-                                char = "+"  # Medium
-                            else:
-                                char = "*"  # Bright
+                        # Choose character based on alpha, then on the brightness of the
+                        # format converted colour (see generate_preview_data)
+                        char = _TEXT_ALPHA[a] or _TEXT_SHADE[r_table[r] + g_table[g] + b_table[b]]
                     else:
                         char = "?"
                 else:
                     char = " "
                     
-                line += char
-            line += "|"
-            lines.append(line)
+                chars.append(char)
+            lines.append("|" + "".join(chars) + "|")
         
         lines.append("=" * (text_width + 2))
         lines.append(f"Format: {preview_format}")
@@ -456,12 +575,9 @@ class SimpleLVGLIconGenerator:
             
             self.last_path = os.path.dirname(output_path)
                 
-            # Generate C file content
-            c_content = self.generate_c_content()
-            
-            # Write file
-            with open(output_path, 'w') as f:
-                f.write(c_content)
+            # Stream the C file content section by section (LF line endings, as C toolchains expect)
+            with open(output_path, 'w', encoding='utf-8', newline='\n', buffering=1024 * 1024) as f:
+                self.generate_c_stream(f)
                 
             self.status_label.config(text=f"Generated: {os.path.basename(output_path)}")
             messagebox.showinfo("Success", f"C file generated successfully!\nSaved to: {output_path}")
@@ -471,170 +587,130 @@ class SimpleLVGLIconGenerator:
             
     def generate_c_content(self):
         """Generate the complete C file content"""
+        out = io.StringIO()
+        self.generate_c_stream(out)
+        return out.getvalue()
+        
+    def generate_c_stream(self, fp):
+        """Write the complete C file content to the text stream fp, section by section"""
         icon_name = self.icon_name.get()
         width = self.image_width.get()
         height = self.image_height.get()
+        depths = [depth for depth, selected in self.target_depths.items() if selected.get()]
         
         # Header
-        content = f'''#ifdef LV_LVGL_H_INCLUDE_SIMPLE
-#include "lvgl.h"
-#else
-#include "lvgl/lvgl.h"
-#endif
-
-#ifndef LV_ATTRIBUTE_MEM_ALIGN
-#define LV_ATTRIBUTE_MEM_ALIGN
-#endif
-#ifndef LV_ATTRIBUTE_IMG_{icon_name.upper()}
-#define LV_ATTRIBUTE_IMG_{icon_name.upper()}
-#endif
-const LV_ATTRIBUTE_MEM_ALIGN LV_ATTRIBUTE_IMG_{icon_name.upper()} uint8_t {icon_name}_map[] = {{
-'''
+        fp.write(_C_HEADER.format(name=icon_name, NAME=icon_name.upper()))
         
         # Generate data for different color depths
-        content += self.generate_color_depth_data()
+        self.generate_color_depth_data(fp, width, height, depths)
         
         # Footer
-        content += f'''}};
-
-const lv_img_dsc_t {icon_name} = {{
-  .header.cf = LV_IMG_CF_TRUE_COLOR_ALPHA,
-  .header.always_zero = 0,
-  .header.reserved = 0,
-  .header.w = {width},
-  .header.h = {height},
-  .data_size = {width} * {height} * LV_IMG_PX_SIZE_ALPHA_BYTE,
-  .data = {icon_name}_map,
-}};
-'''
-        
-        return content
-        
-    def generate_color_depth_data(self):
-        """Generate pixel data for different color depths"""
-        width = self.image_width.get()
-        height = self.image_height.get()
-        
-        # Ensure we have enough pixel data
-        pixel_count = width * height
-        if len(self.input_data) < pixel_count:
-            # Pad with transparent pixels
-            self.input_data.extend([(0, 0, 0, 0)] * (pixel_count - len(self.input_data)))
-        else:
-            # Truncate if too many
-            self.input_data = self.input_data[:pixel_count]
+        fp.write(_C_FOOTER.format(name=icon_name, cf="LV_IMG_CF_TRUE_COLOR_ALPHA", width=width, height=height))
+        
+    def generate_color_depth_data(self, fp, width, height, depths=COLOR_DEPTHS):
+        """Write pixel data for the selected color depths to the text stream fp"""
+        depths = set(depths)
+        # Exactly width * height packed RGBA pixels, padded with transparent ones;
+        # self.input_data is never modified
+        size = width * height * 4
+        pixels = self.input_data[:size]
+        pixels += bytes(size - len(pixels))
+        
+        # Convert whole channel planes with lookup tables (32-bit needs no conversion)
+        if depths != {32}:
+            r, g, b, a = pixels[0::4], pixels[1::4], pixels[2::4], pixels[3::4]
+            opaque = a.translate(_OPAQUE_128)  # 0xFF where alpha >= 128
+            visible = a.translate(_OPAQUE_8)   # 0xFF where alpha >= 8
             
-        content = ""
+        # Blank line between the sections that are written
+        separator = ""
         
         # LV_COLOR_DEPTH == 1 || LV_COLOR_DEPTH == 8
-        content += "#if LV_COLOR_DEPTH == 1 || LV_COLOR_DEPTH == 8\n"
-        content += "  /*Pixel format: Alpha 8 bit, Red: 3 bit, Green: 3 bit, Blue: 2 bit*/\n"
-        
-        # Generate 8-bit indexed data (A8R3G3B2 format)
-        data_8bit = []
-        for r, g, b, a in self.input_data:
-            if a < 128:  # Transparent
-                data_8bit.append(0x00)
-            else:
-                # Convert to 8-bit: A8R3G3B2
-                r3 = (r >> 5) & 0x7
-                g3 = (g >> 5) & 0x7
-                b2 = (b >> 6) & 0x3
-                a8 = 0xFF if a >= 128 else 0x00
-                data_8bit.append(a8)
-                
-        content += self.format_byte_array(data_8bit)
-        content += "\n#endif\n\n"
+        if 8 in depths:
+            fp.write("#if LV_COLOR_DEPTH == 1 || LV_COLOR_DEPTH == 8\n")
+            fp.write("  /*Pixel format: Alpha 8 bit, Red: 3 bit, Green: 3 bit, Blue: 2 bit*/\n")
+            
+            # Generate 8-bit indexed data (A8R3G3B2 format)
+            # Colour byte RRRGGGBB followed by the alpha byte; transparent pixels are 0x00, 0x00
+            color = _or_planes(r.translate(_A8R3G3B2_R), g.translate(_A8R3G3B2_G), b.translate(_A8R3G3B2_B))
+            data_8bit = _interleave(_and_planes(color, opaque), opaque)
+                    
+            self.write_byte_array(fp, data_8bit)
+            fp.write("\n#endif\n")
+            separator = "\n"
         
         # LV_COLOR_DEPTH == 16 (RGB565 + Alpha)
-        content += "#if LV_COLOR_DEPTH == 16\n#if LV_COLOR_16_SWAP == 0\n"
-        content += "  /*Pixel format: Alpha 8 bit, Red: 5 bit, Green: 6 bit, Blue: 5 bit*/\n"
-        
-        # Generate 16-bit RGB565 + Alpha data (little endian)
-        data_16bit = []
-        for r, g, b, a in self.input_data:
-            if a < 8:  # Mostly transparent
-                data_16bit.extend([0x00, 0x00, 0x00])  # RGB565 + Alpha
-            else:
-                # Convert to RGB565
-                r5 = (r >> 3) & 0x1F
-                g6 = (g >> 2) & 0x3F
-                b5 = (b >> 3) & 0x1F
-                rgb565 = (r5 << 11) | (g6 << 5) | b5
-                
-                # Little endian format
-                data_16bit.append(rgb565 & 0xFF)
-                data_16bit.append((rgb565 >> 8) & 0xFF)
-                data_16bit.append(a)
-                
-        content += self.format_byte_array(data_16bit)
-        content += "\n#endif\n\n"
-        
-        # LV_COLOR_DEPTH == 16 (RGB565 Swapped + Alpha) - Alternative format
-        content += "#else\n"
-        content += "  /*Pixel format: Alpha 8 bit, Red: 5 bit, Green: 6 bit, Blue: 5 bit (swapped)*/\n"
-        
-        # Generate 16-bit BGR565 + Alpha data (swapped format)
-        data_16bit_swap = []
-        for r, g, b, a in self.input_data:
-            if a < 8:  # Mostly transparent
-                data_16bit_swap.extend([0x00, 0x00, 0x00])  # BGR565 + Alpha
-            else:
-                # Convert to BGR565 (swapped)
-                b5 = (b >> 3) & 0x1F
-                g6 = (g >> 2) & 0x3F
-                r5 = (r >> 3) & 0x1F
-                bgr565 = (b5 << 11) | (g6 << 5) | r5
-                
-                # Little endian format
-                data_16bit_swap.append(bgr565 & 0xFF)
-                data_16bit_swap.append((bgr565 >> 8) & 0xFF)
-                data_16bit_swap.append(a)
-                
-        content += self.format_byte_array(data_16bit_swap)
-        content += "\n#endif\n#endif\n\n"
+        if 16 in depths:
+            fp.write(separator)
+            fp.write("#if LV_COLOR_DEPTH == 16\n#if LV_COLOR_16_SWAP == 0\n")
+            fp.write("  /*Pixel format: Alpha 8 bit, Red: 5 bit, Green: 6 bit, Blue: 5 bit*/\n")
+            
+            # Generate 16-bit RGB565 + Alpha data (little endian)
+            # Mostly transparent pixels (alpha < 8) stay 0x00, 0x00, 0x00
+            # Green sits in the same bits in both 16-bit layouts, so its planes are shared
+            g_lo, g_hi = g.translate(_RGB565_LO_G), g.translate(_RGB565_HI_G)
+            lo = _or_planes(g_lo, b.translate(_RGB565_LO_B))
+            hi = _or_planes(r.translate(_RGB565_HI_R), g_hi)
+            lo, hi, a_visible = _mask_planes(visible, lo, hi, a)
+            data_16bit = _interleave(lo, hi, a_visible)
+                    
+            self.write_byte_array(fp, data_16bit)
+            fp.write("\n#endif\n\n")
+            
+            # LV_COLOR_DEPTH == 16 (RGB565 Swapped + Alpha) - Alternative format
+            fp.write("#else\n")
+            fp.write("  /*Pixel format: Alpha 8 bit, Red: 5 bit, Green: 6 bit, Blue: 5 bit (swapped)*/\n")
+            
+            # Generate 16-bit BGR565 + Alpha data (swapped format): red and blue trade places
+            lo = _or_planes(g_lo, r.translate(_RGB565_LO_B))
+            hi = _or_planes(b.translate(_RGB565_HI_R), g_hi)
+            lo, hi = _mask_planes(visible, lo, hi)
+            data_16bit_swap = _interleave(lo, hi, a_visible)
+                    
+            self.write_byte_array(fp, data_16bit_swap)
+            fp.write("\n#endif\n#endif\n")
+            separator = "\n"
         
         # LV_COLOR_DEPTH == 24
-        content += "#if LV_COLOR_DEPTH == 24\n"
-        content += "  /*Pixel format: Red: 8 bit, Green: 8 bit, Blue: 8 bit*/\n"
-        
-        # Generate 24-bit RGB data
-        data_24bit = []
-        for r, g, b, a in self.input_data:
-            if a < 128:  # Transparent
-                data_24bit.extend([0x00, 0x00, 0x00])
-            else:
-                data_24bit.extend([r, g, b])
-                
-        content += self.format_byte_array(data_24bit)
-        content += "\n#endif\n\n"
+        if 24 in depths:
+            fp.write(separator)
+            fp.write("#if LV_COLOR_DEPTH == 24\n")
+            fp.write("  /*Pixel format: Red: 8 bit, Green: 8 bit, Blue: 8 bit*/\n")
+            
+            # Generate 24-bit RGB data, black where transparent
+            data_24bit = _interleave(*_mask_planes(opaque, r, g, b))
+                    
+            self.write_byte_array(fp, data_24bit)
+            fp.write("\n#endif\n")
+            separator = "\n"
         
         # LV_COLOR_DEPTH == 32
-        content += "#if LV_COLOR_DEPTH == 32\n"
-        content += "  /*Pixel format: Red: 8 bit, Green: 8 bit, Blue: 8 bit, Alpha: 8 bit*/\n"
-        
-        # Generate 32-bit RGBA data
-        data_32bit = []
-        for r, g, b, a in self.input_data:
-            data_32bit.extend([r, g, b, a])
+        if 32 in depths:
+            fp.write(separator)
+            fp.write("#if LV_COLOR_DEPTH == 32\n")
+            fp.write("  /*Pixel format: Red: 8 bit, Green: 8 bit, Blue: 8 bit, Alpha: 8 bit*/\n")
             
-        content += self.format_byte_array(data_32bit)
-        content += "\n#endif\n"
-        
-        return content
+            # Generate 32-bit RGBA data (already in that layout)
+            self.write_byte_array(fp, pixels)
+            fp.write("\n#endif\n")
+        
+    def write_byte_array(self, fp, data):
+        """Write byte array as C code to the text stream fp, one block of lines at a time"""
+        # Only one block of text exists at a time instead of the whole array's
+        data = memoryview(data if isinstance(data, (bytes, bytearray)) else bytes(data))
+        block = _BYTES_PER_LINE * _LINES_PER_WRITE
+        for start in range(0, len(data), block):
+            if start:
+                fp.write("\n")
+            fp.write(self.format_byte_array(data[start:start + block]))
         
     def format_byte_array(self, data):
         """Format byte array as C code"""
-        lines = []
-        for i in range(0, len(data), 24):  # 24 bytes per line
-            line = "  "
-            for j in range(i, min(i + 24, len(data))):
-                line += f"0x{data[j]:02x}"
-                if j < min(i + 24, len(data)) - 1:
-                    line += ", "
-            line += ","
-            lines.append(line)
-            
+        # memoryview.hex() formats a whole line in C, on a zero-copy window of the buffer;
+        # the separators are spliced in afterwards
+        data = memoryview(data if isinstance(data, (bytes, bytearray, memoryview)) else bytes(data))
+        lines = ["  0x" + data[i:i + _BYTES_PER_LINE].hex(" ").replace(" ", ", 0x") + ","
+                 for i in range(0, len(data), _BYTES_PER_LINE)]
         return "\n".join(lines)
 
 def main():
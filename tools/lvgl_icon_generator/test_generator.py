@@ -6,10 +6,25 @@ Creates a simple test icon and generates C file
 
 import sys
 import os
+import io
+import re
+import tempfile
+from unittest import mock
 sys.path.append(os.path.dirname(__file__))
 
 from PIL import Image
-from generator import LVGLIconGenerator
+from generator import LVGLIconGenerator, IconCodegen
+import generator_cli
+from generator_simple import SimpleLVGLIconGenerator
+
+# 2x2 packed RGBA pixels covering the 8-bit cases: opaque red, half-transparent green
+# (alpha >= 128 counts as opaque), mostly transparent blue, opaque white
+SMALL_PIXELS = bytes([
+    255, 0, 0, 255,     0, 255, 0, 200,
+    0, 0, 255, 100,     255, 255, 255, 255,
+])
+# Colour byte RRRGGGBB, then 0xFF alpha; transparent pixels are 0x00, 0x00
+SMALL_8BIT = bytes([0xE0, 0xFF, 0x1C, 0xFF, 0x00, 0x00, 0xFF, 0xFF])
 
 def create_test_icon():
     """Create a simple test icon"""
@@ -23,6 +38,70 @@ def create_test_icon():
     
     return img
 
+def section_bytes(c_content, condition):
+    """Returns the bytes of the #if section of c_content whose condition starts with condition"""
+    match = re.search(r"#if " + re.escape(condition) + r".*?\n(.*?)#endif", c_content, re.S)
+    assert match, f"missing section: #if {condition}"
+    body = re.sub(r"/\*.*?\*/", "", match.group(1), flags=re.S)
+    return bytes(int(h, 16) for h in re.findall(r"0x([0-9a-fA-F]{2})", body))
+
+def test_codegen_headless():
+    """IconCodegen builds the C file without Tk; streaming and building in memory agree"""
+    codegen = IconCodegen("small_icon", 2, 2, SMALL_PIXELS, a8r5g6b5_swap=False, chroma_key=0xFFFF)
+    c_content = codegen.generate_c_content()
+    stream = io.StringIO()
+    codegen.generate_c_stream(stream)
+    assert c_content == stream.getvalue()
+    
+    assert "LV_COLOR_16_SWAP != 0" not in c_content, "disabled depth was emitted"
+    # The white pixel is 0xFFFF in RGB565, so the chroma key makes it transparent
+    data_16bit = section_bytes(c_content, "LV_COLOR_DEPTH == 16 && LV_COLOR_16_SWAP == 0")
+    assert data_16bit[9:12] == bytes(3), data_16bit.hex()
+
+    # A negative key matches no pixel, like an out-of-range one
+    unkeyed = IconCodegen("small_icon", 2, 2, SMALL_PIXELS, a8r5g6b5_swap=False)
+    negative = IconCodegen("small_icon", 2, 2, SMALL_PIXELS, a8r5g6b5_swap=False, chroma_key=-1)
+    assert negative.generate_c_content() == unkeyed.generate_c_content()
+    print("✓ IconCodegen output matches generate_c_stream")
+
+def test_8bit_layout():
+    """The 8-bit section holds two bytes per pixel: the colour byte, then the alpha byte"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, "small_icon.c")
+        generator_cli.generate_c_file("small_icon", 2, 2, SMALL_PIXELS, output_file, depths=[8])
+        with open(output_file) as f:
+            cli_content = f.read()
+    assert section_bytes(cli_content, "LV_COLOR_DEPTH == 1 || LV_COLOR_DEPTH == 8") == SMALL_8BIT
+    
+    # The GUI-less part of the simple generator only needs input_data
+    simple = SimpleLVGLIconGenerator.__new__(SimpleLVGLIconGenerator)
+    simple.input_data = SMALL_PIXELS
+    out = io.StringIO()
+    simple.generate_color_depth_data(out, 2, 2, depths=[8])
+    data_8bit = section_bytes(out.getvalue(), "LV_COLOR_DEPTH == 1 || LV_COLOR_DEPTH == 8")
+    assert data_8bit == SMALL_8BIT and len(data_8bit) == 2 * 2 * 2
+    print("✓ 8-bit sections are colour + alpha, 2 bytes per pixel")
+
+def test_cli_depths():
+    """Only the requested LV_COLOR_DEPTH sections are written; --depth 1 means the 8-bit data"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, "small_icon.c")
+        generator_cli.generate_c_file("small_icon", 2, 2, SMALL_PIXELS, output_file, depths=[16])
+        with open(output_file) as f:
+            c_content = f.read()
+        assert re.findall(r"#if LV_COLOR_DEPTH == (\d+)", c_content) == ["16"], c_content
+        
+        data = ", ".join("0x%02x" % v for v in SMALL_PIXELS)
+        argv = ["generator_cli.py", "--name", "small_icon", "--width", "2", "--height", "2",
+                "--data", data, "--output", output_file, "--depth", "1"]
+        with mock.patch.object(sys, "argv", argv), mock.patch("sys.stdout", io.StringIO()):
+            assert generator_cli.main() == 0
+        with open(output_file) as f:
+            c_content = f.read()
+        assert re.findall(r"#if LV_COLOR_DEPTH == (\d+)", c_content) == ["1"], c_content
+        assert section_bytes(c_content, "LV_COLOR_DEPTH == 1 || LV_COLOR_DEPTH == 8") == SMALL_8BIT
+    print("✓ --depth emits only the selected sections")
+
 def test_generator():
     """Test the generator functionality"""
     print("Testing LVGL Icon Generator...")
@@ -80,4 +159,8 @@ def test_generator():
     print("Test completed!")
 
 if __name__ == "__main__":
+    # The headless tests run first; test_generator needs a display
+    test_codegen_headless()
+    test_8bit_layout()
+    test_cli_depths()
     test_generator()
@@ -3,9 +3,18 @@
 import os
 import re
 import json
-import struct
+import mmap
+import collections
+import concurrent.futures
+import copy
+import functools
 import tkinter as tk
 from tkinter import filedialog, messagebox
+try:
+    from PIL import Image, ImageTk
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
 
 
 # Map of LVGL image color formats to their integer values.
@@ -24,6 +33,129 @@ LV_IMG_CF_MAP = {
     'LV_IMG_CF_ALPHA_8BIT': 11,
 }
 
+# RGB565 -> 8-bit channel lookup tables, indexed by the low or high byte of the word.
+# Green straddles both bytes: its 6 bits are OR-ed together, then scaled.
+_RGB565_R = bytes(((v >> 3) * 255) // 31 for v in range(256))      # high byte
+_RGB565_G_HI = bytes((v & 0x07) << 3 for v in range(256))          # high byte
+_RGB565_G_LO = bytes(v >> 5 for v in range(256))                   # low byte
+_RGB565_B = bytes(((v & 0x1F) * 255) // 31 for v in range(256))    # low byte
+_SCALE_6 = bytes((min(v, 63) * 255) // 63 for v in range(256))
+
+# RGB332 -> 8-bit channel lookup tables
+_RGB332_R = bytes((((v >> 5) & 0x07) * 255) // 7 for v in range(256))
+_RGB332_G = bytes((((v >> 2) & 0x07) * 255) // 7 for v in range(256))
+_RGB332_B = bytes(((v & 0x03) * 255) // 3 for v in range(256))
+
+# Alpha plane masks for compositing: 0xFF where the pixel is opaque / fully transparent
+_ALPHA_IS_255 = bytes(0xFF if v == 255 else 0x00 for v in range(256))
+_ALPHA_IS_0 = bytes(0xFF if v == 0 else 0x00 for v in range(256))
+# Alpha values that need an actual blend
+_PARTIAL_ALPHA = re.compile(rb'[\x01-\xfe]')
+
+
+def _pixel_rows(data, h, stride, line_bytes):
+    """Returns the first line_bytes of each of the h rows as one buffer, without stride padding."""
+    if stride == line_bytes:
+        return bytes(data[:h * line_bytes])
+    # Slicing a memoryview copies nothing, so join copies each row exactly once
+    view = memoryview(data)
+    return b''.join([view[y * stride:y * stride + line_bytes] for y in range(h)])
+
+
+def _interleave(*planes):
+    """Interleaves equally sized byte planes, one byte per plane per pixel."""
+    step = len(planes)
+    out = bytearray(len(planes[0]) * step)
+    for i, plane in enumerate(planes):
+        out[i::step] = plane
+    return bytes(out)
+
+
+def _or_planes(*planes):
+    """Bitwise ORs byte planes together (on big ints, so it runs in C)."""
+    acc = 0
+    for plane in planes:
+        acc |= int.from_bytes(plane, 'little')
+    return acc.to_bytes(len(planes[0]), 'little')
+
+
+def _mask_planes(mask, *planes):
+    """ANDs each byte plane with the same 0x00/0xFF mask plane."""
+    m = int.from_bytes(mask, 'little')
+    size = len(mask)
+    return [(int.from_bytes(plane, 'little') & m).to_bytes(size, 'little') for plane in planes]
+
+
+def _not_equal_table(value):
+    """Translate table mapping value to 0x00 and every other byte to 0xFF."""
+    return bytes(0x00 if v == value else 0xFF for v in range(256))
+
+
+def _bit_fields(rows, bits, w, h, values):
+    """
+    Unpacks h rows of packed bits-wide fields (most significant first) to one byte
+    per pixel, mapping each field through values and dropping the row padding.
+    """
+    per_byte = 8 // bits
+    mask = (1 << bits) - 1
+    planes = []
+    for k in range(per_byte):
+        shift = 8 - bits * (k + 1)
+        planes.append(rows.translate(bytes(values[(v >> shift) & mask] for v in range(256))))
+    fields = _interleave(*planes)
+
+    row_fields = len(rows) // h * per_byte
+    if row_fields == w:
+        return fields
+    view = memoryview(fields)
+    return b''.join([view[y * row_fields:y * row_fields + w] for y in range(h)])
+
+
+def _rgb565_planes(lo, hi):
+    """Expands the low/high byte planes of RGB565 words to 8-bit R, G and B planes."""
+    r = hi.translate(_RGB565_R)
+    g = _or_planes(hi.translate(_RGB565_G_HI), lo.translate(_RGB565_G_LO)).translate(_SCALE_6)
+    b = lo.translate(_RGB565_B)
+    return r, g, b
+
+
+_C_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+# lv_img_dsc_t descriptors (matched against the raw file bytes) and their fields
+_IMG_DSC_RE = re.compile(rb'const\s+lv_img_dsc_t\s+([a-zA-Z0-9_]+)\s*=\s*{\s*([\s\S]*?)\s*};')
+_HEADER_CF_RE = re.compile(r'\.header\.cf\s*=\s*([A-Z0-9_]+)')
+_HEADER_W_RE = re.compile(r'\.header\.(w|width)\s*=\s*(\d+)')
+_HEADER_H_RE = re.compile(r'\.header\.(h|height)\s*=\s*(\d+)')
+_DATA_SIZE_RE = re.compile(r'\.data_size\s*=\s*([^,;\n]+)')
+_DATA_NAME_RE = re.compile(r'\.data\s*=\s*([a-zA-Z0-9_]+)')
+_NUMBER_RE = re.compile(r'\d+')
+# uint8_t array declarations up to the opening brace of their body
+_ARRAY_DECL_RE = re.compile(rb'const\s+.*?\s*uint8_t\s+([a-zA-Z0-9_]+)\s*\[\s*\]\s*=\s*{')
+# Preprocessor branches inside a pixel array
+_PP_BRANCH_RE = re.compile(r'(#if |#elif )')
+# Bits per pixel in a color format name, e.g. LV_IMG_CF_ALPHA_4BIT
+_CF_BITS_RE = re.compile(r'(\d+)BIT')
+# One byte value of a C array: hex (0x1f) or decimal (31)
+_BYTE_VALUE_RE = re.compile(r'0x([0-9a-fA-F]{1,2})|\b(\d{1,3})\b')
+# A whole array body that is nothing but comma-separated two-digit hex bytes
+_HEX_BYTE_LIST_RE = re.compile(r'(?:\s*0x[0-9a-fA-F]{2}\s*,)*\s*(?:0x[0-9a-fA-F]{2}\s*)?')
+
+
+def _parse_byte_values(data_str):
+    """Parses the byte values (0-255) of a C array body with its comments removed."""
+    # The usual case, all 0x.. bytes, is checked by one regex match and decoded in one C pass
+    if _HEX_BYTE_LIST_RE.fullmatch(data_str):
+        return bytes.fromhex(data_str.replace(',', ' ').replace('0x', ''))
+
+    buf = bytearray()
+    for hx, dec in _BYTE_VALUE_RE.findall(data_str):
+        if hx:
+            buf.append(int(hx, 16))
+        elif dec:
+            iv = int(dec)
+            if 0 <= iv <= 255:
+                buf.append(iv)
+    return bytes(buf)
+
 
 class LvglImage:
     """Represents a decoded LVGL image header and data."""
@@ -39,22 +171,36 @@ class LvglImage:
 
 def parse_lvgl_c_file(path):
     """Parses an LVGL C file to extract all image descriptors and their data, including different pixel maps from #if blocks."""
-    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-        text = f.read()
+    # The file is memory-mapped rather than read: the regexes scan the mapping and only the
+    # descriptor and array bodies they find are decoded to str
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return {}
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as text:
+            return _parse_lvgl_images(text)
+
 
+def _parse_lvgl_images(text):
+    """Extracts the image descriptors and pixel maps from the raw bytes of an LVGL C file."""
     images = {}
+
+    # Where the body of each uint8_t array starts, by name, from one scan of the file;
+    # the first declaration of a name wins
+    array_bodies = {}
+    for decl in _ARRAY_DECL_RE.finditer(text):
+        array_bodies.setdefault(decl.group(1).decode('ascii'), decl.end())
     
-    for dsc_match in re.finditer(r'const\s+lv_img_dsc_t\s+([a-zA-Z0-9_]+)\s*=\s*{\s*([\s\S]*?)\s*};', text):
-        img_name = dsc_match.group(1)
-        dsc_body = dsc_match.group(2)
+    for dsc_match in _IMG_DSC_RE.finditer(text):
+        img_name = dsc_match.group(1).decode('ascii')
+        dsc_body = dsc_match.group(2).decode('utf-8', errors='ignore')
         
         img = LvglImage()
 
-        cf_match = re.search(r'\.header\.cf\s*=\s*([A-Z0-9_]+)', dsc_body)
-        w_match = re.search(r'\.header\.(w|width)\s*=\s*(\d+)', dsc_body)
-        h_match = re.search(r'\.header\.(h|height)\s*=\s*(\d+)', dsc_body)
-        ds_match = re.search(r'\.data_size\s*=\s*([^,;\n]+)', dsc_body)
-        data_name_match = re.search(r'\.data\s*=\s*([a-zA-Z0-9_]+)', dsc_body)
+        cf_match = _HEADER_CF_RE.search(dsc_body)
+        w_match = _HEADER_W_RE.search(dsc_body)
+        h_match = _HEADER_H_RE.search(dsc_body)
+        ds_match = _DATA_SIZE_RE.search(dsc_body)
+        data_name_match = _DATA_NAME_RE.search(dsc_body)
 
         if cf_match:
             img.cf_name = cf_match.group(1)
@@ -90,18 +236,20 @@ def parse_lvgl_c_file(path):
                     img.data_size = int(ds_expr)
             except:
                 # Fallback: just grab the first number
-                m = re.search(r'\d+', ds_expr)
+                m = _NUMBER_RE.search(ds_expr)
                 img.data_size = int(m.group(0)) if m else None
 
         if data_name_match:
             data_name = data_name_match.group(1)
             
-            arr_re = re.compile(r'const\s+.*\s*uint8_t\s+%s\s*\[\s*\]\s*=\s*{([\s\S]*?)};' % re.escape(data_name))
-            m = arr_re.search(text)
-            if m:
-                body = m.group(1)
+            # The body runs to the first '};', found with find instead of a lazy regex scan
+            # over the whole hex dump
+            body_start = array_bodies.get(data_name)
+            body_end = text.find(b'};', body_start) if body_start is not None else -1
+            if body_end >= 0:
+                body = text[body_start:body_end].decode('utf-8', errors='ignore')
                 
-                blocks = re.split(r'(#if |#elif )', body)
+                blocks = _PP_BRANCH_RE.split(body)
                 
                 if len(blocks) > 1:
                     if blocks[0].strip() == '':
@@ -115,32 +263,13 @@ def parse_lvgl_c_file(path):
                         data_str = condition_and_data[1].split('#endif')[0]
                         
                         # Remove comments before parsing bytes
-                        data_str = re.sub(r'/\*.*?\*/', '', data_str, flags=re.DOTALL)
-                        
-                        values = re.findall(r'0x([0-9a-fA-F]{1,2})|\b(\d{1,3})\b', data_str)
-                        buf = bytearray()
-                        for hx, dec in values:
-                            if hx:
-                                buf.append(int(hx, 16))
-                            elif dec:
-                                iv = int(dec)
-                                if 0 <= iv <= 255:
-                                    buf.append(iv)
-                        img.pixel_maps[condition] = bytes(buf)
+                        data_str = _C_COMMENT_RE.sub('', data_str)
+                        img.pixel_maps[condition] = _parse_byte_values(data_str)
                 
                 if not img.pixel_maps:
                     # Remove comments before parsing bytes
-                    body = re.sub(r'/\*.*?\*/', '', body, flags=re.DOTALL)
-                    values = re.findall(r'0x([0-9a-fA-F]{1,2})|\b(\d{1,3})\b', body)
-                    buf = bytearray()
-                    for hx, dec in values:
-                        if hx:
-                            buf.append(int(hx, 16))
-                        elif dec:
-                            iv = int(dec)
-                            if 0 <= iv <= 255:
-                                buf.append(iv)
-                    img.pixel_maps['Default'] = bytes(buf)
+                    body = _C_COMMENT_RE.sub('', body)
+                    img.pixel_maps['Default'] = _parse_byte_values(body)
 
         images[img_name] = img
         
@@ -164,26 +293,13 @@ def decode_true_color_rgb565(img, swap16=False, stride=0):
     data = img.data_bytes
     if len(data) < expected:
         return None
-    out = bytearray(w * h * 4)
-    oi = 0
-    for y in range(h):
-        di = y * stride
-        for _ in range(w):
-            lo = data[di]
-            hi = data[di + 1]
-            di += 2
-            if swap16:
-                lo, hi = hi, lo
-            value = (hi << 8) | lo
-            r5 = (value >> 11) & 0x1F
-            g6 = (value >> 5) & 0x3F
-            b5 = value & 0x1F
-            r = (r5 * 255) // 31
-            g = (g6 * 255) // 63
-            b = (b5 * 255) // 31
-            out[oi:oi + 4] = bytes((r, g, b, 255))
-            oi += 4
-    return bytes(out)
+    # Decode whole byte planes with lookup tables instead of one word at a time
+    pixels = _pixel_rows(data, h, stride, line_bytes)
+    lo, hi = pixels[0::2], pixels[1::2]
+    if swap16:
+        lo, hi = hi, lo
+    r, g, b = _rgb565_planes(lo, hi)
+    return _interleave(r, g, b, b'\xff' * (w * h))
 
 
 def decode_true_color_rgb332(img, stride=0):
@@ -204,22 +320,10 @@ def decode_true_color_rgb332(img, stride=0):
     data = img.data_bytes
     if len(data) < expected:
         return None
-    out = bytearray(w * h * 4)
-    oi = 0
-    for y in range(h):
-        di = y * stride
-        for _ in range(w):
-            value = data[di]
-            di += 1
-            r3 = (value >> 5) & 0x07
-            g3 = (value >> 2) & 0x07
-            b2 = value & 0x03
-            r = (r3 * 255) // 7
-            g = (g3 * 255) // 7
-            b = (b2 * 255) // 3
-            out[oi:oi + 4] = bytes((r, g, b, 255))
-            oi += 4
-    return bytes(out)
+    # One byte per pixel, so each channel is a single table lookup over all pixels
+    pixels = _pixel_rows(data, h, stride, line_bytes)
+    return _interleave(pixels.translate(_RGB332_R), pixels.translate(_RGB332_G),
+                       pixels.translate(_RGB332_B), b'\xff' * len(pixels))
 
 
 def decode_true_color_chroma_keyed_rgb565(img, chroma_key_value, swap16=False, stride=0):
@@ -243,33 +347,20 @@ def decode_true_color_chroma_keyed_rgb565(img, chroma_key_value, swap16=False, s
     data = img.data_bytes
     if len(data) < expected:
         return None
-    out = bytearray(w * h * 4)
-    oi = 0
-    
-    for y in range(h):
-        di = y * stride
-        for _ in range(w):
-            lo = data[di]
-            hi = data[di + 1]
-            di += 2
-            if swap16:
-                lo, hi = hi, lo
-            value = (hi << 8) | lo
-            
-            if value == chroma_key_value:
-                r, g, b, a = 0, 0, 0, 0  # Transparent
-            else:
-                r5 = (value >> 11) & 0x1F
-                g6 = (value >> 5) & 0x3F
-                b5 = value & 0x1F
-                r = (r5 * 255) // 31
-                g = (g6 * 255) // 63
-                b = (b5 * 255) // 31
-                a = 255 # Opaque
-
-            out[oi:oi + 4] = bytes((r, g, b, a))
-            oi += 4
-    return bytes(out)
+    pixels = _pixel_rows(data, h, stride, line_bytes)
+    lo, hi = pixels[0::2], pixels[1::2]
+    if swap16:
+        lo, hi = hi, lo
+    r, g, b = _rgb565_planes(lo, hi)
+    a = b'\xff' * (w * h)  # Opaque
+
+    if 0 <= chroma_key_value <= 0xFFFF:
+        # Pixels whose word equals the key become transparent black: keep a pixel
+        # if either of its bytes differs from the key's
+        keep = _or_planes(lo.translate(_not_equal_table(chroma_key_value & 0xFF)),
+                          hi.translate(_not_equal_table(chroma_key_value >> 8)))
+        r, g, b, a = _mask_planes(keep, r, g, b, a)
+    return _interleave(r, g, b, a)
 
 
 def decode_true_color_chroma_keyed_rgb332(img, chroma_key_value, stride=0):
@@ -293,29 +384,14 @@ def decode_true_color_chroma_keyed_rgb332(img, chroma_key_value, stride=0):
     data = img.data_bytes
     if len(data) < expected:
         return None
-    out = bytearray(w * h * 4)
-    oi = 0
-
-    for y in range(h):
-        di = y * stride
-        for _ in range(w):
-            value = data[di]
-            di += 1
-
-            if value == chroma_key_value:
-                r, g, b, a = 0, 0, 0, 0  # Transparent
-            else:
-                r3 = (value >> 5) & 0x07
-                g3 = (value >> 2) & 0x07
-                b2 = value & 0x03
-                r = (r3 * 255) // 7
-                g = (g3 * 255) // 7
-                b = (b2 * 255) // 3
-                a = 255 # Opaque
-
-            out[oi:oi + 4] = bytes((r, g, b, a))
-            oi += 4
-    return bytes(out)
+    # One byte per pixel, so each channel is a single table lookup; the key's table
+    # entries are cleared to make it transparent black
+    tables = [_RGB332_R, _RGB332_G, _RGB332_B, b'\xff' * 256]
+    if 0 <= chroma_key_value <= 0xFF:
+        k = chroma_key_value
+        tables = [table[:k] + b'\x00' + table[k + 1:] for table in tables]
+    pixels = _pixel_rows(data, h, stride, line_bytes)
+    return _interleave(*(pixels.translate(table) for table in tables))
 
 
 def decode_true_color_chroma_keyed_rgba8888(img, chroma_key_value, stride=0):
@@ -339,21 +415,18 @@ def decode_true_color_chroma_keyed_rgba8888(img, chroma_key_value, stride=0):
     data = img.data_bytes
     if len(data) < expected:
         return None
-    out = bytearray(w * h * 4)
-    oi = 0
-    for y in range(h):
-        di = y * stride
-        for _ in range(w):
-            value = struct.unpack_from('<I', data, di)[0]
-            di += 4
-            if value == chroma_key_value:
-                r, g, b, a = 0, 0, 0, 0 # Transparent
-            else:
-                b_val, g_val, r_val, _a_val = data[di-4:di]
-                r, g, b, a = r_val, g_val, b_val, 255 # Opaque
-            out[oi:oi+4] = bytes((r, g, b, a))
-            oi += 4
-    return bytes(out)
+    pixels = _pixel_rows(data, h, stride, line_bytes)
+    planes = [pixels[k::4] for k in range(4)]  # B, G, R, X
+    r, g, b = planes[2], planes[1], planes[0]
+    a = b'\xff' * (w * h)  # Opaque
+
+    if 0 <= chroma_key_value <= 0xFFFFFFFF:
+        # Pixels whose little-endian word equals the key become transparent black: keep a
+        # pixel if any of its four bytes differs from the key's
+        key = chroma_key_value.to_bytes(4, 'little')
+        keep = _or_planes(*(plane.translate(_not_equal_table(k)) for plane, k in zip(planes, key)))
+        r, g, b, a = _mask_planes(keep, r, g, b, a)
+    return _interleave(r, g, b, a)
 
 
 def decode_true_color_rgb888(img, stride=0):
@@ -374,16 +447,9 @@ def decode_true_color_rgb888(img, stride=0):
     data = img.data_bytes
     if len(data) < expected:
         return None
-    out = bytearray(w * h * 4)
-    oi = 0
-    for y in range(h):
-        di = y * stride
-        for _ in range(w):
-            r, g, b = data[di:di+3]
-            di += 3
-            out[oi:oi+4] = bytes((r, g, b, 255))
-            oi += 4
-    return bytes(out)
+    # Add an opaque alpha plane to the R, G and B planes
+    pixels = _pixel_rows(data, h, stride, line_bytes)
+    return _interleave(pixels[0::3], pixels[1::3], pixels[2::3], b'\xff' * (w * h))
 
 
 def decode_true_color_alpha_v7_bgra(img, stride=0):
@@ -404,15 +470,11 @@ def decode_true_color_alpha_v7_bgra(img, stride=0):
     data = img.data_bytes
     if len(data) < expected:
         return None
-    out = bytearray(w * h * 4)
-    oi = 0
-    for y in range(h):
-        di = y * stride
-        for _ in range(w):
-            b, g, r, a = data[di:di+4]
-            di += 4
-            out[oi:oi+4] = bytes((r, g, b, a))
-            oi += 4
+    # Swap the B and R planes with two strided slice copies
+    pixels = _pixel_rows(data, h, stride, line_bytes)
+    out = bytearray(pixels)
+    out[0::4] = pixels[2::4]
+    out[2::4] = pixels[0::4]
     return bytes(out)
 
 
@@ -434,16 +496,8 @@ def decode_true_color_alpha_v8_rgba(img, stride=0):
     data = img.data_bytes
     if len(data) < expected:
         return None
-    
-    out = bytearray(w * h * 4)
-    oi = 0
-    for y in range(h):
-        di = y * stride
-        for x in range(w):
-            out[oi:oi+4] = data[di:di+4]
-            di += 4
-            oi += 4
-    return bytes(out)
+    # Already RGBA: only the row padding is dropped
+    return _pixel_rows(data, h, stride, line_bytes)
 
 
 def decode_true_color_alpha_rgb565(img, swap16=False, stride=0):
@@ -464,31 +518,13 @@ def decode_true_color_alpha_rgb565(img, swap16=False, stride=0):
     data = img.data_bytes
     if len(data) < expected:
         return None
-    out = bytearray(w * h * 4)
-    oi = 0
-    for y in range(h):
-        di = y * stride
-        for _ in range(w):
-            b1 = data[di]
-            b2 = data[di + 1]
-            alpha = data[di + 2]
-            di += 3
-            
-            if swap16:
-                lo, hi = b2, b1
-            else:
-                lo, hi = b1, b2
-            
-            value = (hi << 8) | lo
-            r5 = (value >> 11) & 0x1F
-            g6 = (value >> 5) & 0x3F
-            b5 = value & 0x1F
-            r = (r5 * 255) // 31
-            g = (g6 * 255) // 63
-            b = (b5 * 255) // 31
-            out[oi:oi + 4] = bytes((r, g, b, alpha))
-            oi += 4
-    return bytes(out)
+    # Decode the colour planes with lookup tables, the alpha plane is used as it is
+    pixels = _pixel_rows(data, h, stride, line_bytes)
+    lo, hi = pixels[0::3], pixels[1::3]
+    if swap16:
+        lo, hi = hi, lo
+    r, g, b = _rgb565_planes(lo, hi)
+    return _interleave(r, g, b, pixels[2::3])
 
 
 def decode_true_color_rgba8888(img, stride=0):
@@ -509,15 +545,12 @@ def decode_true_color_rgba8888(img, stride=0):
     data = img.data_bytes
     if len(data) < expected:
         return None
-    out = bytearray(w * h * 4)
-    oi = 0
-    for y in range(h):
-        di = y * stride
-        for _ in range(w):
-            b, g, r, _a = data[di:di+4]
-            di += 4
-            out[oi:oi+4] = bytes((r, g, b, 255))
-            oi += 4
+    # Swap the B and R planes and make the pixels opaque with strided slice copies
+    pixels = _pixel_rows(data, h, stride, line_bytes)
+    out = bytearray(pixels)
+    out[0::4] = pixels[2::4]
+    out[2::4] = pixels[0::4]
+    out[3::4] = b'\xff' * (w * h)
     return bytes(out)
 
 
@@ -545,39 +578,17 @@ def decode_alpha_to_grayscale(img, bits, stride=0):
     if img.data_size and img.data_size < expected_bytes:
         return None
 
-    out = bytearray(w * h * 4)
-    oi = 0
-    mask = (1 << bits) - 1
+    # Missing trailing data decodes as fully transparent
+    if len(data) < expected_bytes:
+        data = bytes(data) + bytes(expected_bytes - len(data))
 
-    for y in range(h):
-        line_start_byte_index = y * stride
-        bit_offset_in_line = 0
-        for x in range(w):
-            byte_index = line_start_byte_index + (bit_offset_in_line // 8)
-            bit_in_byte = bit_offset_in_line % 8
-            
-            shift = 8 - bits - bit_in_byte
-
-            try:
-                byte = data[byte_index]
-            except IndexError:
-                break
-
-            idx = (byte >> shift) & mask
-
-            if bits == 1:
-                alpha = 255 if idx else 0
-            elif bits == 2:
-                alpha = (idx * 85)
-            elif bits == 4:
-                alpha = (idx * 17)
-            else:  # 8
-                alpha = idx
-
-            out[oi:oi+4] = bytes((0, 0, 0, alpha))
-            oi += 4
-            bit_offset_in_line += bits
+    # Scale each field to 0-255 while unpacking: 1-bit 0/255, 2-bit * 85, 4-bit * 17
+    mask = (1 << bits) - 1
+    scale = bytes(v * (255 // mask) for v in range(mask + 1))
+    alpha = _bit_fields(_pixel_rows(data, h, stride, line_bytes), bits, w, h, scale)
 
+    out = bytearray(w * h * 4)
+    out[3::4] = alpha
     return bytes(out)
 
 
@@ -617,20 +628,11 @@ def decode_indexed(img, bits, depth, swap16=False, stride=0):
             b, g, r, a = palette_raw[i:i+4]
             palette.append((r, g, b, a))
     elif pal_stride == 3:
-        for i in range(0, pal_bytes, 3):
-            lo = palette_raw[i]
-            hi = palette_raw[i+1]
-            a = palette_raw[i+2]
-            if swap16:
-                lo, hi = hi, lo
-            value = (hi << 8) | lo
-            r5 = (value >> 11) & 0x1F
-            g6 = (value >> 5) & 0x3F
-            b5 = value & 0x1F
-            r = (r5 * 255) // 31
-            g = (g6 * 255) // 63
-            b = (b5 * 255) // 31
-            palette.append((r, g, b, a))
+        # RGB565 + alpha entries, expanded with the same tables as the pixel decoders
+        lo, hi = palette_raw[0::3], palette_raw[1::3]
+        if swap16:
+            lo, hi = hi, lo
+        palette = list(zip(*_rgb565_planes(lo, hi), palette_raw[2::3]))
     else: # pal_stride == 2
         for i in range(0, pal_bytes, 2):
             value = palette_raw[i]
@@ -643,66 +645,156 @@ def decode_indexed(img, bits, depth, swap16=False, stride=0):
             b = (b2 * 255) // 3
             palette.append((r, g, b, a))
 
-    out = bytearray(w * h * 4)
-    oi = 0
-    mask = (1 << bits) - 1
-    
-    for y in range(h):
-        line_start_byte_index = y * bytes_per_line
-        bit_offset_in_line = 0
-        
-        for x in range(w):
-            byte_index = line_start_byte_index + (bit_offset_in_line // 8)
-            bit_in_byte = bit_offset_in_line % 8
-            
-            shift = 8 - bits - bit_in_byte
-            
-            try:
-                byte = pixels_raw[byte_index]
-            except IndexError:
-                break
+    # Unpack the palette indices, one byte per pixel
+    line_bytes = (w * bits + 7) // 8
+    lines = [pixels_raw[y * bytes_per_line:y * bytes_per_line + line_bytes] for y in range(h)]
+    if all(len(line) == line_bytes for line in lines):
+        indices = _bit_fields(b''.join(lines), bits, w, h, range(colors))
+    else:
+        # A stride shorter than a line makes the last lines run past the data: keep
+        # the complete pixels of each line, packed one after the other
+        per_byte = 8 // bits
+        indices = b''.join([_bit_fields(line.ljust(line_bytes, b'\0'), bits, w, 1, range(colors))[:len(line) * per_byte]
+                            for line in lines])
+
+    # Look every index up in the palette, one channel plane at a time
+    channels = [bytes(color[c] for color in palette) for c in range(4)]
+    rgba = _interleave(*(indices.translate(channel.ljust(256, b'\0')) for channel in channels))
+    return rgba.ljust(w * h * 4, b'\0')
+
+
+@functools.lru_cache(maxsize=16)
+def checkerboard(w, h):
+    """Returns the gray checkerboard shown behind transparent pixels, one byte per pixel (cached per size)."""
+    CHECKER_SIZE = 8
+    C1 = 64  # Squares where (x // 8) and (y // 8) have the same parity
+    C2 = 96
+    # Only two distinct rows exist, each repeated for CHECKER_SIZE lines
+    row = bytes(C1 if (x // CHECKER_SIZE) % 2 == 0 else C2 for x in range(w))
+    rows = (row, row.translate(bytes.maketrans(bytes((C1, C2)), bytes((C2, C1)))))
+    return b''.join([rows[(y // CHECKER_SIZE) % 2] for y in range(h)])
+
+
+def composite_on_checkerboard(w, h, rgba_bytes):
+    """Blends RGBA bytes over the checkerboard and returns the RGB bytes."""
+    bg = checkerboard(w, h)
+    r, g, b, a = (rgba_bytes[i:w * h * 4:4] for i in range(4))
+
+    # Opaque pixels show their own colour, fully transparent ones the background
+    opaque = a.translate(_ALPHA_IS_255)
+    clear = a.translate(_ALPHA_IS_0)
+    bg_clear, = _mask_planes(clear, bg)
+    rgb = bytearray(_interleave(*(_or_planes(plane, bg_clear) for plane in _mask_planes(opaque, r, g, b))))
+
+    # Blend the partially transparent pixels, with one lookup table per (alpha, background)
+    src = _interleave(r, g, b)
+    blend_tables = {}
+    for match in _PARTIAL_ALPHA.finditer(a):
+        i = match.start()
+        key = (a[i], bg[i])
+        table = blend_tables.get(key)
+        if table is None:
+            alpha_f = a[i] / 255.0
+            inv_alpha_f = 1.0 - alpha_f
+            table = blend_tables[key] = bytes(int(c * alpha_f + bg[i] * inv_alpha_f) for c in range(256))
+        j = 3 * i
+        rgb[j:j + 3] = src[j:j + 3].translate(table)
+    return bytes(rgb)
 
-            idx = (byte >> shift) & mask
-            
-            try:
-                r, g, b, a = palette[idx]
-                out[oi:oi+4] = bytes((r, g, b, a))
-                oi += 4
-                bit_offset_in_line += bits
-            except IndexError:
-                pass
-    return bytes(out)
 
+def composite_for_photo(w, h, rgba_bytes):
+    """Blends raw RGBA bytes onto the checkerboard. Needs no Tk, so it can run off the Tk thread."""
+    if PIL_AVAILABLE:
+        # Pillow blends in C; its rounding may differ from the PPM path by one step
+        fg = Image.frombuffer('RGBA', (w, h), rgba_bytes, 'raw', 'RGBA', 0, 1)
+        bg = Image.frombuffer('L', (w, h), checkerboard(w, h), 'raw', 'L', 0, 1).convert('RGBA')
+        return Image.alpha_composite(bg, fg).convert('RGB')
 
-def rgba_bytes_to_photo(master, w, h, rgba_bytes):
-    """Converts raw RGBA bytes into a Tkinter PhotoImage with a checkerboard background."""
-    rgb = bytearray(w * h * 3)
-    CHECKER_SIZE = 8
-    C1 = (64, 64, 64)
-    C2 = (96, 96, 96)
+    # Without Pillow: blend in Python into a binary PPM for Tk
+    header = f"P6\n{w} {h}\n255\n".encode('ascii')
+    return header + composite_on_checkerboard(w, h, rgba_bytes)
 
-    for y in range(h):
-        for x in range(w):
-            if (x // CHECKER_SIZE) % 2 == (y // CHECKER_SIZE) % 2:
-                bg_r, bg_g, bg_b = C1
-            else:
-                bg_r, bg_g, bg_b = C2
 
-            i = (y * w + x) * 4
-            r, g, b, a = rgba_bytes[i:i+4]
+def photo_from_composite(composited):
+    """Wraps the result of composite_for_photo in a Tkinter PhotoImage (Tk thread only)."""
+    if isinstance(composited, bytes):
+        return tk.PhotoImage(data=composited, format='PPM')
+    return ImageTk.PhotoImage(composited)
 
-            alpha_f = a / 255.0
-            inv_alpha_f = 1.0 - alpha_f
-            out_r = int(r * alpha_f + bg_r * inv_alpha_f)
-            out_g = int(g * alpha_f + bg_g * inv_alpha_f)
-            out_b = int(b * alpha_f + bg_b * inv_alpha_f)
 
-            ri = (y * w + x) * 3
-            rgb[ri:ri+3] = bytes((out_r, out_g, out_b))
+def update_photo(photo, composited):
+    """Overwrites a same-sized photo made by photo_from_composite in place (Tk thread only)."""
+    if isinstance(composited, bytes):
+        photo.configure(data=composited, format='PPM')
+    else:
+        photo.paste(composited)
+
+
+# Marks a render job whose pixels are not in the decode cache yet
+_NOT_DECODED = object()
+
+
+def render_job(img, settings, rgba):
+    """
+    Decodes (unless rgba is already known) and composites one image; runs on the render thread.
+    Returns (rgba, composited, transparent), where transparent is True if every alpha is 0.
+    """
+    if rgba is _NOT_DECODED:
+        rgba = decode_image(img, *settings)
+    if rgba is None:
+        return None, None, False
+    # The alpha plane is all zero bytes exactly when its zero count equals its length
+    alpha = rgba[3::4]
+    transparent = alpha.count(0) == len(alpha)
+    return rgba, composite_for_photo(img.width, img.height, rgba), transparent
+
+
+def decode_image(img, cf_name, depth, swap, lvgl_version, true_color_format, stride, chroma_key_val):
+    """Decodes img as the color format cf_name with the given settings. Returns RGBA bytes or None."""
+    rgba = None
+    if cf_name == 'LV_IMG_CF_TRUE_COLOR_ALPHA':
+        if depth == '16':
+            rgba = decode_true_color_alpha_rgb565(img, swap16=swap, stride=stride)
+        elif lvgl_version == 'v7':
+            rgba = decode_true_color_alpha_v7_bgra(img, stride=stride)
+        else:  # v8/v9
+            rgba = decode_true_color_alpha_v8_rgba(img, stride=stride)
+    elif cf_name in ('LV_IMG_CF_TRUE_COLOR', 'LV_IMG_CF_TRUE_COLOR_CHROMA_KEYED'):
+        tcf = true_color_format
+        if tcf == 'AUTO':
+            if depth == '8': tcf = 'RGB332'
+            elif depth == '16': tcf = 'RGB565'
+            else: tcf = 'XRGB8888'
+
+        is_chroma = cf_name == 'LV_IMG_CF_TRUE_COLOR_CHROMA_KEYED'
+
+        if tcf == 'RGB332':
+            rgba = decode_true_color_chroma_keyed_rgb332(img, chroma_key_val, stride=stride) if is_chroma else decode_true_color_rgb332(img, stride=stride)
+        elif tcf == 'RGB565':
+            rgba = decode_true_color_chroma_keyed_rgb565(img, chroma_key_val, swap16=swap, stride=stride) if is_chroma else decode_true_color_rgb565(img, swap16=swap, stride=stride)
+        elif tcf == 'RGB888':
+            if not is_chroma: rgba = decode_true_color_rgb888(img, stride=stride)
+        elif tcf == 'XRGB8888':
+            rgba = decode_true_color_chroma_keyed_rgba8888(img, chroma_key_val, stride=stride) if is_chroma else decode_true_color_rgba8888(img, stride=stride)
+        elif tcf == 'ARGB8888':
+            if not is_chroma:
+                if lvgl_version == 'v7': rgba = decode_true_color_alpha_v7_bgra(img, stride=stride)
+                else: rgba = decode_true_color_alpha_v8_rgba(img, stride=stride)
+    elif cf_name in ('LV_IMG_CF_ALPHA_1BIT', 'LV_IMG_CF_ALPHA_2BIT', 'LV_IMG_CF_ALPHA_4BIT', 'LV_IMG_CF_ALPHA_8BIT'):
+        bits = int(_CF_BITS_RE.search(cf_name).group(1))
+        rgba = decode_alpha_to_grayscale(img, bits, stride=stride)
+    elif cf_name == 'LV_IMG_CF_INDEXED_1BIT':
+        rgba = decode_indexed(img, 1, depth, swap16=swap, stride=stride)
+    elif cf_name == 'LV_IMG_CF_INDEXED_2BIT':
+        rgba = decode_indexed(img, 2, depth, swap16=swap, stride=stride)
+    elif cf_name == 'LV_IMG_CF_INDEXED_4BIT':
+        rgba = decode_indexed(img, 4, depth, swap16=swap, stride=stride)
+    elif cf_name == 'LV_IMG_CF_INDEXED_8BIT':
+        rgba = decode_indexed(img, 8, depth, swap16=swap, stride=stride)
+
+    return rgba
+
 
-    header = f"P6\n{w} {h}\n255\n".encode('ascii')
-    ppm = header + bytes(rgb)
-    return tk.PhotoImage(data=ppm, format='PPM')
 
 
 class ViewerApp:
@@ -718,7 +810,11 @@ class ViewerApp:
         self.chroma_key = '0xF81F' # Default chroma key is magenta
         self.true_color_format = 'AUTO'
         self.stride = 0
+        # Last state written to disk and the pending debounced write, if any
+        self.saved_state = None
+        self.pending_state_save = None
         self._load_state()
+        master.protocol('WM_DELETE_WINDOW', self._on_close)
 
         ctrl = tk.Frame(master)
         ctrl.pack(side=tk.TOP, fill=tk.X, padx=8, pady=8)
@@ -744,6 +840,9 @@ class ViewerApp:
         self.pixel_map_menu = tk.OptionMenu(row2, self.pixel_map_var, '')
         self.pixel_map_menu.config(width=40)
         self.pixel_map_menu.pack(side=tk.LEFT)
+        # The entries currently listed in the two menus
+        self.image_menu_names = None
+        self.pixel_map_menu_names = None
 
         row3 = tk.Frame(ctrl)
         row3.pack(side=tk.TOP, fill=tk.X, pady=(6, 0))
@@ -797,10 +896,27 @@ class ViewerApp:
 
         self.canvas = tk.Canvas(master, width=300, height=200, bg='#202020', highlightthickness=0)
         self.canvas.pack(fill=tk.BOTH, expand=True)
+        # A single image item is kept on the canvas; rendering only swaps its photo
+        self.canvas_image = self.canvas.create_image(0, 0, anchor='nw')
+        self.canvas_size = None
+        # Decoding and compositing run on this thread; render_gen identifies the latest render
+        self.render_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.render_gen = 0
+        # Compare decodes its candidate formats on a separate pool. The decoders hold the GIL
+        # for their C passes, so more threads would only contend for it
+        self.compare_pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
 
         self.current_img = None
         self.current_rgba = None
         self.loaded_images = {}
+        # Recently decoded RGBA buffers, keyed by the pixel data and every decode setting; the
+        # pixel data in the key keeps entries valid across file loads
+        self.decode_cache = collections.OrderedDict()
+        # Recently parsed files, keyed by path, mtime and size
+        self.parse_cache = collections.OrderedDict()
+        # The open Compare window and the image/settings it was built for
+        self.compare_window = None
+        self.compare_key = None
         self.master.bind('<Configure>', self._on_resize)
 
     def on_open(self):
@@ -817,7 +933,8 @@ class ViewerApp:
 
     def load_file(self, path):
         try:
-            self.loaded_images = parse_lvgl_c_file(path)
+            self.loaded_images = self.parse_file(path)
+            self.compare_key = None
             if not self.loaded_images:
                 messagebox.showwarning('No Images Found', 'No LVGL image descriptors found in this file.')
                 return
@@ -825,10 +942,13 @@ class ViewerApp:
             img_names = list(self.loaded_images.keys())
             self.image_select_var.set(img_names[0])
             
-            menu = self.image_select_menu['menu']
-            menu.delete(0, 'end')
-            for name in img_names:
-                menu.add_command(label=name, command=lambda n=name: self.on_image_selected(n))
+            # Reloading a file with the same images keeps the menu as it is
+            if tuple(img_names) != self.image_menu_names:
+                menu = self.image_select_menu['menu']
+                menu.delete(0, 'end')
+                for name in img_names:
+                    menu.add_command(label=name, command=lambda n=name: self.on_image_selected(n))
+                self.image_menu_names = tuple(img_names)
             
             self.on_image_selected(img_names[0])
             self.last_dir = os.path.dirname(path) or self.last_dir
@@ -836,6 +956,19 @@ class ViewerApp:
         except Exception as e:
             messagebox.showerror('Error', f'Failed to parse file:\n{e}')
 
+    def parse_file(self, path):
+        """Parses path, reusing the previous result while the file's size and mtime are unchanged."""
+        st = os.stat(path)
+        key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+        if key in self.parse_cache:
+            self.parse_cache.move_to_end(key)
+            return self.parse_cache[key]
+        images = parse_lvgl_c_file(path)
+        self.parse_cache[key] = images
+        if len(self.parse_cache) > 8:
+            self.parse_cache.popitem(last=False)
+        return images
+
     def on_image_selected(self, img_name):
         self.image_select_var.set(img_name)
         img = self.loaded_images.get(img_name)
@@ -844,18 +977,22 @@ class ViewerApp:
 
         pixel_maps = list(img.pixel_maps.keys())
         
-        menu = self.pixel_map_menu['menu']
-        menu.delete(0, 'end')
+        # Images of one file usually share the same #if branches; only rebuild the menu
+        # when the list of pixel maps changes
+        if tuple(pixel_maps) != self.pixel_map_menu_names:
+            menu = self.pixel_map_menu['menu']
+            menu.delete(0, 'end')
+            for name in pixel_maps:
+                menu.add_command(label=name, command=lambda n=name: self.pixel_map_var.set(n))
+            self.pixel_map_menu_names = tuple(pixel_maps)
 
         if pixel_maps:
             self.pixel_map_var.set(pixel_maps[0])
-            for name in pixel_maps:
-                menu.add_command(label=name, command=lambda n=name: self.pixel_map_var.set(n))
             self.on_render()
         else:
             self.pixel_map_var.set('')
             self.info_var.set(f"Image '{img_name}' found, but no pixel data could be parsed.")
-            self.canvas.delete('all')
+            self.clear_canvas()
 
     def on_render(self):
         if not self.loaded_images:
@@ -872,7 +1009,7 @@ class ViewerApp:
         selected_map_name = self.pixel_map_var.get()
         if not selected_map_name:
             self.info_var.set(f"Image '{selected_img_name}' has no pixel maps to render.")
-            self.canvas.delete('all')
+            self.clear_canvas()
             return
         
         img.data_bytes = img.pixel_maps[selected_map_name]
@@ -903,70 +1040,73 @@ class ViewerApp:
         self.chroma_key = self.chroma_key_var.get()
         self._save_state()
 
-        rgba = None
+        # Decode and composite on the render thread so Tk stays responsive; the decode cache
+        # and the PhotoImage are only touched here on the Tk thread
+        settings = (cf_name, depth, swap, lvgl_version, true_color_format, stride, chroma_key_val)
+        key = self.decode_key(img, *settings)
+        self.render_gen += 1
+        job = self.render_pool.submit(render_job, copy.copy(img), settings, self.cached_decode(key))
+        self.master.after(10, self.finish_render, self.render_gen, job, key, img.width, img.height)
+
+    def finish_render(self, gen, job, key, w, h):
+        if gen != self.render_gen:
+            return  # Superseded by a newer render or a cleared canvas
+        if not job.done():
+            self.master.after(10, self.finish_render, gen, job, key, w, h)
+            return
         try:
-            if cf_name == 'LV_IMG_CF_TRUE_COLOR_ALPHA':
-                if depth == '16':
-                    rgba = decode_true_color_alpha_rgb565(img, swap16=swap, stride=stride)
-                elif lvgl_version == 'v7':
-                    rgba = decode_true_color_alpha_v7_bgra(img, stride=stride)
-                else:  # v8/v9
-                    rgba = decode_true_color_alpha_v8_rgba(img, stride=stride)
-            elif cf_name in ('LV_IMG_CF_TRUE_COLOR', 'LV_IMG_CF_TRUE_COLOR_CHROMA_KEYED'):
-                tcf = true_color_format
-                if tcf == 'AUTO':
-                    if depth == '8': tcf = 'RGB332'
-                    elif depth == '16': tcf = 'RGB565'
-                    else: tcf = 'XRGB8888'
-
-                is_chroma = cf_name == 'LV_IMG_CF_TRUE_COLOR_CHROMA_KEYED'
-
-                if tcf == 'RGB332':
-                    rgba = decode_true_color_chroma_keyed_rgb332(img, chroma_key_val, stride=stride) if is_chroma else decode_true_color_rgb332(img, stride=stride)
-                elif tcf == 'RGB565':
-                    rgba = decode_true_color_chroma_keyed_rgb565(img, chroma_key_val, swap16=swap, stride=stride) if is_chroma else decode_true_color_rgb565(img, swap16=swap, stride=stride)
-                elif tcf == 'RGB888':
-                    if not is_chroma: rgba = decode_true_color_rgb888(img, stride=stride)
-                elif tcf == 'XRGB8888':
-                    rgba = decode_true_color_chroma_keyed_rgba8888(img, chroma_key_val, stride=stride) if is_chroma else decode_true_color_rgba8888(img, stride=stride)
-                elif tcf == 'ARGB8888':
-                    if not is_chroma:
-                        if lvgl_version == 'v7': rgba = decode_true_color_alpha_v7_bgra(img, stride=stride)
-                        else: rgba = decode_true_color_alpha_v8_rgba(img, stride=stride)
-            elif cf_name in ('LV_IMG_CF_ALPHA_1BIT', 'LV_IMG_CF_ALPHA_2BIT', 'LV_IMG_CF_ALPHA_4BIT', 'LV_IMG_CF_ALPHA_8BIT'):
-                bits = int(re.search(r'(\d+)BIT', cf_name).group(1))
-                rgba = decode_alpha_to_grayscale(img, bits, stride=stride)
-            elif cf_name == 'LV_IMG_CF_INDEXED_1BIT':
-                rgba = decode_indexed(img, 1, depth, swap16=swap, stride=stride)
-            elif cf_name == 'LV_IMG_CF_INDEXED_2BIT':
-                rgba = decode_indexed(img, 2, depth, swap16=swap, stride=stride)
-            elif cf_name == 'LV_IMG_CF_INDEXED_4BIT':
-                rgba = decode_indexed(img, 4, depth, swap16=swap, stride=stride)
-            elif cf_name == 'LV_IMG_CF_INDEXED_8BIT':
-                rgba = decode_indexed(img, 8, depth, swap16=swap, stride=stride)
-            else:
-                rgba = None
+            rgba, composited, transparent = job.result()
         except Exception as e:
             messagebox.showerror('Error', f'Decode failed:\n{e}')
             return
+        self.remember_decode(key, rgba)
 
         if rgba is None:
             messagebox.showwarning('Warning', 'Unsupported format or decode failed (showing nothing).')
             self.current_img = None
             self.current_rgba = None
-            self.canvas.delete('all')
+            self.clear_canvas()
             return
 
-        if all(rgba[i+3] == 0 for i in range(0, len(rgba), 4)):
+        if transparent:
              messagebox.showinfo('Possible issue detected', 'The decoded image is completely transparent. This often means the wrong color format was selected, or the original image was encoded with a transparent alpha channel.')
 
 
         self.current_rgba = rgba
-        ph = rgba_bytes_to_photo(self.master, img.width, img.height, rgba)
+        # Same size as the photo on screen: overwrite its pixels rather than allocating a new one
+        ph = self.current_img
+        if ph is not None and (ph.width(), ph.height()) == (w, h):
+            update_photo(ph, composited)
+        else:
+            ph = photo_from_composite(composited)
         self.current_img = ph
-        self.canvas.delete('all')
-        self.canvas.config(width=max(320, img.width), height=max(240, img.height))
-        self.canvas.create_image(0, 0, anchor='nw', image=ph)
+        canvas_size = (max(320, w), max(240, h))
+        if canvas_size != self.canvas_size:
+            self.canvas.config(width=canvas_size[0], height=canvas_size[1])
+            self.canvas_size = canvas_size
+        self.canvas.itemconfig(self.canvas_image, image=ph)
+
+    def clear_canvas(self):
+        self.render_gen += 1
+        self.canvas.itemconfig(self.canvas_image, image='')
+
+    def cached_decode(self, key):
+        """Returns the recent decode result for key (RGBA bytes or None), or _NOT_DECODED."""
+        if key not in self.decode_cache:
+            return _NOT_DECODED
+        self.decode_cache.move_to_end(key)
+        return self.decode_cache[key]
+
+    def decode_key(self, img, cf_name, depth, swap, lvgl_version, true_color_format, stride, chroma_key_val):
+        # The pixel data itself is part of the key, so a reloaded file never hits stale entries
+        return (img.data_bytes, img.width, img.height, img.data_size, cf_name, depth, swap,
+                lvgl_version, true_color_format, stride, chroma_key_val)
+
+    def remember_decode(self, key, rgba):
+        self.decode_cache[key] = rgba
+        self.decode_cache.move_to_end(key)
+        if len(self.decode_cache) > 32:
+            self.decode_cache.popitem(last=False)
 
     def format_info(self, img):
         return (
@@ -1003,6 +1143,13 @@ class ViewerApp:
         except (ValueError, IndexError):
             chroma_key_val = 0xF81F # Default to magenta if parsing fails
 
+        # Nothing changed since the last Compare: bring its window back instead of rebuilding it
+        key = (selected_img_name, selected_map_name, depth, swap, lvgl_version, true_color_format, stride, chroma_key_val)
+        if key == self.compare_key and self.compare_window is not None and self.compare_window.winfo_exists():
+            self.compare_window.deiconify()
+            self.compare_window.lift()
+            return
+
         candidates = [
             'LV_IMG_CF_TRUE_COLOR_ALPHA',
             'LV_IMG_CF_TRUE_COLOR',
@@ -1022,73 +1169,55 @@ class ViewerApp:
         grid = tk.Frame(win, bg="#202020")
         grid.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
 
-        photos = []
+        # Decode and composite every candidate on the pool; tiles are filled in on the Tk
+        # thread as their jobs finish
+        tiles = []
         row = 0
         col = 0
         for name in candidates:
-            try:
-                if name == 'LV_IMG_CF_TRUE_COLOR_ALPHA':
-                    if depth == '16':
-                        rgba = decode_true_color_alpha_rgb565(img, swap16=swap, stride=stride)
-                    elif lvgl_version == 'v7':
-                        rgba = decode_true_color_alpha_v7_bgra(img, stride=stride)
-                    else:  # v8/v9
-                        rgba = decode_true_color_alpha_v8_rgba(img, stride=stride)
-                elif name in ('LV_IMG_CF_TRUE_COLOR', 'LV_IMG_CF_TRUE_COLOR_CHROMA_KEYED'):
-                    tcf = true_color_format
-                    if tcf == 'AUTO':
-                        if depth == '8': tcf = 'RGB332'
-                        elif depth == '16': tcf = 'RGB565'
-                        else: tcf = 'XRGB8888'
-
-                    is_chroma = name == 'LV_IMG_CF_TRUE_COLOR_CHROMA_KEYED'
-
-                    if tcf == 'RGB332':
-                        rgba = decode_true_color_chroma_keyed_rgb332(img, chroma_key_val, stride=stride) if is_chroma else decode_true_color_rgb332(img, stride=stride)
-                    elif tcf == 'RGB565':
-                        rgba = decode_true_color_chroma_keyed_rgb565(img, chroma_key_val, swap16=swap, stride=stride) if is_chroma else decode_true_color_rgb565(img, swap16=swap, stride=stride)
-                    elif tcf == 'RGB888':
-                        if not is_chroma: rgba = decode_true_color_rgb888(img, stride=stride)
-                    elif tcf == 'XRGB8888':
-                        rgba = decode_true_color_chroma_keyed_rgba8888(img, chroma_key_val, stride=stride) if is_chroma else decode_true_color_rgba8888(img, stride=stride)
-                    elif tcf == 'ARGB8888':
-                        if not is_chroma:
-                            if lvgl_version == 'v7': rgba = decode_true_color_alpha_v7_bgra(img, stride=stride)
-                            else: rgba = decode_true_color_alpha_v8_rgba(img, stride=stride)
-                elif name in ('LV_IMG_CF_ALPHA_1BIT', 'LV_IMG_CF_ALPHA_2BIT', 'LV_IMG_CF_ALPHA_4BIT', 'LV_IMG_CF_ALPHA_8BIT'):
-                    bits = int(re.search(r'(\d+)BIT', name).group(1))
-                    rgba = decode_alpha_to_grayscale(img, bits, stride=stride)
-                elif name == 'LV_IMG_CF_INDEXED_1BIT':
-                    rgba = decode_indexed(img, 1, depth, swap16=swap, stride=stride)
-                elif name == 'LV_IMG_CF_INDEXED_2BIT':
-                    rgba = decode_indexed(img, 2, depth, swap16=swap, stride=stride)
-                elif name == 'LV_IMG_CF_INDEXED_4BIT':
-                    rgba = decode_indexed(img, 4, depth, swap16=swap, stride=stride)
-                elif name == 'LV_IMG_CF_INDEXED_8BIT':
-                    rgba = decode_indexed(img, 8, depth, swap16=swap, stride=stride)
-                else:
-                    rgba = None
-            except Exception:
-                rgba = None
-
             frame = tk.Frame(grid, bd=1, relief=tk.SOLID)
             frame.grid(row=row, column=col, padx=6, pady=6, sticky='nsew')
             tk.Label(frame, text=name, anchor='w', fg="white", bg="#202020").pack(fill=tk.X)
             canvas = tk.Canvas(frame, width=max(160, img.width), height=max(120, img.height), bg='#202020', highlightthickness=0)
             canvas.pack()
 
-            if rgba is not None:
-                ph = rgba_bytes_to_photo(win, img.width, img.height, rgba)
-                photos.append(ph)
-                canvas.create_image(0, 0, anchor='nw', image=ph)
-            else:
-                canvas.create_text(10, 10, anchor='nw', fill='white', text='N/A')
+            settings = (name, depth, swap, lvgl_version, true_color_format, stride, chroma_key_val)
+            decode_key = self.decode_key(img, *settings)
+            job = self.compare_pool.submit(render_job, copy.copy(img), settings, self.cached_decode(decode_key))
+            tiles.append((canvas, decode_key, job))
 
             col += 1
             if col >= 3:
                 col = 0
                 row += 1
-        win._photos = photos
+        win._photos = []
+        self.compare_window = win
+        self.compare_key = key
+        self.master.after(10, self.finish_compare, win, tiles)
+
+    def finish_compare(self, win, tiles):
+        if not win.winfo_exists():
+            return
+        pending = []
+        for canvas, decode_key, job in tiles:
+            if not job.done():
+                pending.append((canvas, decode_key, job))
+                continue
+            try:
+                rgba, composited, _transparent = job.result()
+            except Exception:
+                rgba = None
+            else:
+                self.remember_decode(decode_key, rgba)
+
+            if rgba is not None:
+                ph = photo_from_composite(composited)
+                win._photos.append(ph)
+                canvas.create_image(0, 0, anchor='nw', image=ph)
+            else:
+                canvas.create_text(10, 10, anchor='nw', fill='white', text='N/A')
+        if pending:
+            self.master.after(10, self.finish_compare, win, pending)
 
     def _on_resize(self, event):
         try:
@@ -1119,6 +1248,13 @@ class ViewerApp:
             pass
 
     def _save_state(self):
+        """Schedules a state write; saves in quick succession (every render) share one write."""
+        if self.pending_state_save is not None:
+            self.master.after_cancel(self.pending_state_save)
+        self.pending_state_save = self.master.after(500, self._flush_state)
+
+    def _flush_state(self):
+        self.pending_state_save = None
         try:
             data = {
                 'last_dir': self.last_dir,
@@ -1129,11 +1265,31 @@ class ViewerApp:
                 'true_color_format': self.true_color_format_var.get(),
                 'stride': self.stride_var.get()
             }
-            with open(self.state_path, 'w', encoding='utf-8') as f:
+            if data == self.saved_state:
+                return
+            # Write a temporary file and swap it in, so an interrupted write never leaves a
+            # truncated state file behind
+            tmp_path = self.state_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f)
+            os.replace(tmp_path, self.state_path)
+            self.saved_state = data
         except Exception:
             pass
 
+    def _on_close(self):
+        if self.pending_state_save is not None:
+            self.master.after_cancel(self.pending_state_save)
+            self._flush_state()
+        # Drop queued decodes so a large Compare does not hold up interpreter exit
+        for pool in (self.render_pool, self.compare_pool):
+            try:
+                pool.shutdown(wait=False, cancel_futures=True)
+            except TypeError:
+                # cancel_futures is Python 3.9+
+                pool.shutdown(wait=False)
+        self.master.destroy()
+
     def on_reload(self):
         path = (self.path_var.get() or '').strip()
         if not path: